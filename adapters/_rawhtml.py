@@ -0,0 +1,147 @@
+"""
+Regex helpers for reading result cards straight out of the raw page HTML,
+without building a tree. Used by the fast paths of adapters whose card
+templates are stable; anything unexpected makes them return None so the
+adapter can fall back to its DOM parser.
+"""
+
+import html
+import re
+
+# Attribute list of an opening tag, allowing '>' inside quoted values
+_ATTRS = r'''(?:[^>"']|"[^"]*"|'[^']*')*'''
+_RE_ATTR = re.compile(r'''([^\s"'=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?''')
+_RE_ANY_TAG = re.compile(rf'<[/!?a-zA-Z]{_ATTRS}>')
+_RE_SKIPPED = re.compile(r'<!--.*?-->|<(script|style)\b.*?</\1\s*>', re.S | re.I)
+_RE_SKIPPED_START = re.compile(r'<!--|<(?:script|style)\b', re.I)
+
+_open_tag_cache = {}
+_tag_cache = {}
+
+
+def _open_tag_re(tag):
+    pattern = _open_tag_cache.get(tag)
+    if pattern is None:
+        pattern = _open_tag_cache[tag] = re.compile(rf'<({tag})(\s{_ATTRS})?>', re.I)
+    return pattern
+
+
+def _tag_re(tag):
+    pattern = _tag_cache.get(tag)
+    if pattern is None:
+        pattern = _tag_cache[tag] = re.compile(rf'<(/?){re.escape(tag)}(?:\s{_ATTRS})?>', re.I)
+    return pattern
+
+
+def attrs(attr_text):
+    """
+    Parses the attribute part of an opening tag into a dict of unescaped values.
+    """
+    found = {}
+    for m in _RE_ATTR.finditer(attr_text or ''):
+        name = m.group(1).lower()
+        if name in found:
+            continue
+        value = m.group(2)
+        if value is None:
+            value = m.group(3)
+        if value is None:
+            value = m.group(4) or ''
+        found[name] = html.unescape(value)
+    return found
+
+
+def _blank(m):
+    # A '<! ... >' of the same length: still a tag boundary for text(), but
+    # never an element, and the offsets of everything around it are unchanged
+    return '<!' + ' ' * (m.end() - m.start() - 3) + '>'
+
+
+def _masked(fragment):
+    """
+    The fragment with every comment and script/style element blanked out: the
+    markup inside them is not part of the DOM, so it must never be matched.
+    """
+    if _RE_SKIPPED_START.search(fragment) is None:
+        return fragment
+    return _RE_SKIPPED.sub(_blank, fragment)
+
+
+def _inner_end(scan, tag, start):
+    depth = 1
+    for m in _tag_re(tag).finditer(scan, start):
+        if m.group(1):
+            depth -= 1
+            if not depth:
+                return m.start()
+        elif not m.group(0).endswith('/>'):
+            depth += 1
+    return None
+
+
+def inner_html(fragment, tag, start):
+    """
+    Returns the inner HTML of the <tag> element whose opening tag ends at
+    `start`, balancing nested elements of the same name. None if unclosed.
+    """
+    scan = _masked(fragment)
+    end = _inner_end(scan, tag, start)
+    return scan[start:end] if end is not None else None
+
+
+def _hinted_matches(fragment, pattern, hint):
+    # Jump between occurrences of the hint with str.find and only try the
+    # opening-tag regex on the tag each one sits in
+    pos = fragment.find(hint)
+    while pos != -1:
+        m = pattern.match(fragment, fragment.rfind('<', 0, pos))
+        if m is not None and m.end() > pos:
+            yield m
+            pos = fragment.find(hint, m.end())
+        else:
+            pos = fragment.find(hint, pos + len(hint))
+
+
+def iter_elements(fragment, tag, match=None, hint=None):
+    """
+    Yields (attrs, inner_html) for each <tag> element in a fragment, in document
+    order, optionally filtered by a predicate on its attrs. `tag` is a regex
+    alternation of tag names; when `hint` is given only opening tags containing
+    it are considered. Tags inside comments and script/style bodies are
+    ignored (the yielded inner HTML has them blanked out too, so nested
+    lookups on it skip the masking). Raises ValueError on an unclosed element.
+    """
+    scan = _masked(fragment)
+    pattern = _open_tag_re(tag)
+    if hint is None:
+        matches = pattern.finditer(scan)
+    else:
+        matches = _hinted_matches(scan, pattern, hint)
+    for m in matches:
+        element_attrs = attrs(m.group(2))
+        if match is not None and not match(element_attrs):
+            continue
+        end = _inner_end(scan, m.group(1), m.end())
+        if end is None:
+            raise ValueError(f"unclosed <{m.group(1)}>")
+        yield element_attrs, scan[m.end():end]
+
+
+def find_element(fragment, tag, match=None, hint=None):
+    """
+    First (attrs, inner_html) pair from iter_elements(), or None.
+    """
+    return next(iter_elements(fragment, tag, match, hint), None)
+
+
+def class_tokens(element_attrs):
+    return element_attrs.get('class', '').split()
+
+
+def text(fragment):
+    """
+    Equivalent of BeautifulSoup's get_text(strip=True) for a raw HTML fragment.
+    """
+    # Comments and script/style bodies still separate the text around them
+    fragment = _RE_SKIPPED.sub('<br>', fragment)
+    return ''.join(html.unescape(t).strip() for t in _RE_ANY_TAG.split(fragment))
@@ -0,0 +1,30 @@
+"""
+Record type returned by the site adapters, one per listing found on a page.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Listing:
+    """
+    A listing as scraped from a results page. Slotted, so the thousands of
+    these a full run produces cost a fraction of the equivalent dicts.
+    """
+    id: str
+    title: str
+    url: str
+    price: str
+    site: str
+
+    def as_dict(self):
+        """
+        The listing as the plain dict the adapters used to return.
+        """
+        return {
+            'id': self.id,
+            'title': self.title,
+            'url': self.url,
+            'price': self.price,
+            'site': self.site,
+        }
@@ -0,0 +1,140 @@
+"""
+Shared helpers for the site adapters: lxml tree utilities for the adapters
+that skip BeautifulSoup, plus a few helpers used by every adapter.
+"""
+
+import hashlib
+import json
+import threading
+import lxml.html
+from bs4 import NavigableString
+from lxml import etree
+
+try:
+    import orjson
+except ImportError: # no orjson build for PyPy; fall back to the stdlib decoder
+    orjson = None
+
+# lxml parsers can be reused across documents but not shared between threads,
+# so each thread (the scraper's asyncio.to_thread workers) keeps its own
+_parsers = threading.local()
+
+# Text nodes as BeautifulSoup's get_text() sees them (script/style excluded)
+_TEXT_NODES = etree.XPath('descendant-or-self::*[not(self::script or self::style)]/text()')
+
+# Origin that relative links on each site resolve against, keyed by the 'site'
+# value the adapter emits
+_BASES = {
+    'casasapo': 'https://casa.sapo.pt',
+    'custojusto': 'https://www.custojusto.pt',
+    'decisoesesolucoes': 'https://www.decisoesesolucoes.com',
+    'era': 'https://www.era.pt',
+    'factorvalor': 'https://www.factorvalor.pt',
+    'h-urb': 'https://www.h-urb.com',
+    'idealista': 'https://www.idealista.pt',
+    'imovirtual': 'https://www.imovirtual.com',
+    'lardesonho': 'https://www.lardesonho.pt',
+    'olx': 'https://www.olx.pt',
+    'remax': 'https://www.remax.pt',
+    'zome': 'https://www.zome.pt',
+}
+
+_LOWERCASE_CLASS = "translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+
+
+def _get_parsers():
+    parsers = getattr(_parsers, 'pair', None)
+    if parsers is None:
+        # No id() lookup table and no whitespace-only text nodes; neither is
+        # used by the adapters (element_text strips text anyway)
+        options = dict(collect_ids=False, remove_blank_text=True)
+        parsers = _parsers.pair = (
+            lxml.html.HTMLParser(**options),
+            lxml.html.HTMLParser(encoding='utf-8', **options),
+        )
+    return parsers
+
+
+def parse_html(html_content):
+    """
+    Parses a page into an lxml tree. Returns None for empty documents.
+    """
+    parser, utf8_parser = _get_parsers()
+    try:
+        return lxml.html.fromstring(html_content, parser=parser)
+    except ValueError:
+        # str input that still carries an XML encoding declaration
+        return lxml.html.fromstring(html_content.encode('utf-8'), parser=utf8_parser)
+    except etree.ParserError:
+        return None
+
+
+def element_text(el):
+    """
+    Equivalent of BeautifulSoup's get_text(strip=True) for lxml elements.
+    """
+    return ''.join(t.strip() for t in _TEXT_NODES(el))
+
+
+def fast_text(tag):
+    """
+    BeautifulSoup get_text(strip=True), short-circuited for the common case of
+    a tag wrapping a single text node (e.g. <h2><a>Title</a></h2>).
+    """
+    s = tag.string
+    if type(s) is NavigableString:
+        return s.strip()
+    return tag.get_text(strip=True)
+
+
+def class_contains(*needles):
+    """
+    XPath predicate matching elements whose class attribute contains any of
+    the given substrings, case-insensitively (like class_=re.compile(..., re.I)).
+    """
+    return ' or '.join(f"contains({_LOWERCASE_CLASS}, '{n.lower()}')" for n in needles)
+
+
+def has_class(name):
+    """
+    XPath predicate matching elements that carry the exact class token `name`.
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def first(el, path):
+    """
+    Returns the first element matched by an XPath expression (a string or a
+    precompiled etree.XPath), or None.
+    """
+    found = path(el) if isinstance(path, etree.XPath) else el.xpath(path)
+    return found[0] if found else None
+
+
+def abs_url(site, url):
+    """
+    Makes a listing href absolute by prefixing the site's origin. Absolute and
+    empty URLs are returned unchanged.
+    """
+    if not url or url.startswith('http'):
+        return url
+    return _BASES[site] + url
+
+
+def loads_json(text):
+    """
+    Decodes a JSON document embedded in the page (e.g. a <script> body).
+    """
+    if orjson is not None:
+        # orjson only accepts exact str/bytes, not NavigableString
+        return orjson.loads(text.encode())
+    return json.loads(text)
+
+
+def stable_id(value):
+    """
+    Deterministic listing ID derived from a URL (or URL path) for cards that
+    carry no native identifier. Existing rows in the properties table are keyed
+    on this MD5 digest, so changing the algorithm would re-announce them all.
+    """
+    return hashlib.md5(value.encode('utf-8'), usedforsecurity=False).hexdigest()
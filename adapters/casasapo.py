@@ -1,48 +1,113 @@
-from bs4 import BeautifulSoup
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
 import re
-import hashlib
+from adapters import _rawhtml
+from adapters._util import stable_id, fast_text, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_SEARCH_ITEM = re.compile(r'searchItem')
+
+# Only build the listing cards; the rest of the page is skipped by the parser
+_STRAINER = SoupStrainer('div', class_=_RE_SEARCH_ITEM)
+
+def _is_search_item(attrs):
+    return 'searchItem' in attrs.get('class', '')
+
+def _is_title(attrs):
+    return 'searchItemTitle' in _rawhtml.class_tokens(attrs)
+
+def _is_value(attrs):
+    return 'searchItemValue' in _rawhtml.class_tokens(attrs)
+
+def _has_href(attrs):
+    return 'href' in attrs
+
+def _make_listing(prop_id, title, href, price):
+    """
+    Builds the Listing from a card's raw fields. Both the raw-HTML and the soup
+    path go through here, so a card gets the same URL and ID whichever ran.
+    """
+    url = abs_url('casasapo', href)
+    if not prop_id and url:
+        prop_id = stable_id(url)
+    return Listing(
+        id=prop_id,
+        title=title,
+        url=url,
+        price=price,
+        site='casasapo'
+    )
+
+def _parse_casasapo_fast(html_content):
+    """
+    Reads the searchItem results straight from the raw HTML, without building a tree.
+    Returns None when no card is found or the markup is not what we expect.
+    """
+    properties = []
+    seen_ids = set()
+    try:
+        for item_attrs, item in _rawhtml.iter_elements(html_content, 'div', _is_search_item, hint='searchItem'):
+            title_el = _rawhtml.find_element(item, 'span', _is_title, hint='searchItemTitle')
+            title = _rawhtml.text(title_el[1]) if title_el else "Sem título"
+
+            link = _rawhtml.find_element(item, 'a', _has_href)
+            href = link[0]['href'] if link else ""
+
+            price_el = _rawhtml.find_element(item, 'span', _is_value, hint='searchItemValue')
+            price = _rawhtml.text(price_el[1]) if price_el else "Preço não disponível"
+
+            prop = _make_listing(item_attrs.get('data-id'), title, href, price)
+            if prop.id in seen_ids:
+                continue
+            seen_ids.add(prop.id)
+            properties.append(prop)
+    except ValueError:
+        return None
+    return properties or None
 
 def parse_casasapo(html_content):
     """
     Parser for Casa.Sapo.pt listings.
     Extracts property ID, title, URL, and price from standard CasaSapo search results.
+    The card template is stable, so the raw HTML is scanned first; the strained
+    soup is only built when that finds nothing.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    if isinstance(html_content, str):
+        properties = _parse_casasapo_fast(html_content)
+        if properties is not None:
+            return properties
+
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=_STRAINER)
     properties = []
+    seen_ids = set()
     
     # Casa SAPO listings
-    listings = soup.find_all('div', class_=re.compile(r'searchItem'))
+    listings = soup.find_all('div', class_=_RE_SEARCH_ITEM)
     
     for item in listings:
         try:
-            # Extract ID from data-id
-            prop_id = item.get('data-id')
-            
             # Title
             title_tag = item.find('span', class_='searchItemTitle')
-            title = title_tag.get_text(strip=True) if title_tag else "Sem título"
+            title = fast_text(title_tag) if title_tag else "Sem título"
             
             # URL
             link_tag = item.find('a', href=True)
-            url = link_tag['href'] if link_tag else ""
-            if url and not url.startswith('http'):
-                url = "https://casa.sapo.pt" + url
+            href = link_tag['href'] if link_tag else ""
             
             # Price
             price_tag = item.find('span', class_='searchItemValue')
-            price = price_tag.get_text(strip=True) if price_tag else "Preço não disponível"
-
-            if not prop_id and url:
-                prop_id = hashlib.md5(url.encode()).hexdigest()
-
-            properties.append({
-                'id': prop_id,
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'casasapo'
-            })
+            price = fast_text(price_tag) if price_tag else "Preço não disponível"
+
+            # ID from data-id
+            prop = _make_listing(item.get('data-id'), title, href, price)
+            if prop.id in seen_ids:
+                continue
+            seen_ids.add(prop.id)
+            properties.append(prop)
         except Exception as e:
-            print(f"Erro ao processar um item do Casa SAPO: {e}")
+            logger.debug("Erro ao processar um item do Casa SAPO: %s", e)
+            continue
             
     return properties
@@ -1,17 +1,27 @@
-from bs4 import BeautifulSoup
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
 import re
-import hashlib
+from adapters._util import fast_text, stable_id, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_ITEM_CARD = re.compile(r'itemCard_link')
+
+# Only build the listing anchors; the rest of the page is skipped by the parser
+_STRAINER = SoupStrainer('a', class_=_RE_ITEM_CARD)
 
 def parse_custojusto(html_content):
     """
     Parser for CustoJusto.pt listings.
     Targets listing-item patterns and extracts IDs directly from URL structures when possible.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=_STRAINER)
     properties = []
+    seen_ids = set()
     
     # CustoJusto listings are likely 'a' tags with specific classes
-    listings = soup.find_all('a', class_=re.compile(r'itemCard_link'))
+    listings = soup.find_all('a', class_=_RE_ITEM_CARD)
     
     for item in listings:
         try:
@@ -20,26 +30,30 @@ def parse_custojusto(html_content):
             
             # URL and Title
             url = item.get('href', "")
-            if url and not url.startswith('http'):
-                url = "https://www.custojusto.pt" + url
+            url = abs_url('custojusto', url)
                 
             title = item.get('title') or "Sem título"
             
             # Price
             price_tag = item.find('h5')
-            price = price_tag.get_text(strip=True) if price_tag else "Preço não disponível"
+            price = fast_text(price_tag) if price_tag else "Preço não disponível"
 
             if not prop_id and url:
-                prop_id = hashlib.md5(url.encode()).hexdigest()
+                prop_id = stable_id(url)
+
+            if prop_id in seen_ids:
+                continue
+            seen_ids.add(prop_id)
 
-            properties.append({
-                'id': prop_id,
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'custojusto'
-            })
+            properties.append(Listing(
+                id=prop_id,
+                title=title,
+                url=url,
+                price=price,
+                site='custojusto'
+            ))
         except Exception as e:
-            print(f"Erro ao processar um item do CustoJusto: {e}")
+            logger.debug("Erro ao processar um item do CustoJusto: %s", e)
+            continue
             
     return properties
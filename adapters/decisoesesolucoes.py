@@ -1,14 +1,22 @@
+import logging
 from bs4 import BeautifulSoup
 import re
 from urllib.parse import urlparse, parse_qs
+from adapters._util import fast_text, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_ID_PARAM = re.compile(r'id=(\d+)')
 
 def parse_decisoesesolucoes(html_content):
     """
     Parser for decisoesesolucoes.com listings.
     Targets elements with 'property-card' class.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml')
     properties = []
+    seen_ids = set()
     
     # Each listing is in a 'property-card' div
     cards = soup.find_all('div', class_='property-card')
@@ -27,8 +35,7 @@ def parse_decisoesesolucoes(html_content):
                     continue
 
             url = link_tag['href']
-            if not url.startswith('http'):
-                url = "https://www.decisoesesolucoes.com" + url
+            url = abs_url('decisoesesolucoes', url)
 
             # Extract ID from URL query param 'id'
             parsed_url = urlparse(url)
@@ -37,7 +44,7 @@ def parse_decisoesesolucoes(html_content):
 
             if not prop_id:
                 # Fallback: maybe just hash the URL or look for other patterns
-                prop_id = re.search(r'id=(\d+)', url)
+                prop_id = _RE_ID_PARAM.search(url)
                 if prop_id: prop_id = prop_id.group(1)
             
             if not prop_id:
@@ -46,22 +53,27 @@ def parse_decisoesesolucoes(html_content):
             # 2. Title
             # Structure: <div class="card-content"><header><h3>Title</h3>...
             title_tag = card.find('h3')
-            title = title_tag.get_text(strip=True) if title_tag else "Decisões e Soluções Property"
+            title = fast_text(title_tag) if title_tag else "Decisões e Soluções Property"
 
             # 3. Price
             # <span class="price" itemprop="price">350.000 €</span>
             price_tag = card.find(class_='price')
-            price = price_tag.get_text(strip=True) if price_tag else "N/A"
+            price = fast_text(price_tag) if price_tag else "N/A"
+
+            if prop_id in seen_ids:
+                continue
+            seen_ids.add(prop_id)
 
-            properties.append({
-                'id': str(prop_id),
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'decisoesesolucoes'
-            })
+            properties.append(Listing(
+                id=str(prop_id),
+                title=title,
+                url=url,
+                price=price,
+                site='decisoesesolucoes'
+            ))
             
         except Exception as e:
+            logger.debug("Erro ao processar um item de Decisões e Soluções: %s", e)
             continue
             
     return properties
@@ -1,6 +1,22 @@
+import logging
 from bs4 import BeautifulSoup
 import re
-import hashlib
+from adapters._util import stable_id, fast_text, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_IMOVEL_HREF = re.compile(r'/imovel/', re.I)
+_RE_TRAIL_ID = re.compile(r'/(\d{4,})(?:\?|$|#)')
+_RE_PATH_ID = re.compile(r'/imovel/[^/]+/(\d+)')
+_RE_ANY_ID = re.compile(r'/(\d{4,})')
+_RE_CARD = re.compile(r'card', re.I)
+_RE_CARD_PARENT = re.compile(r'card|listing|property', re.I)
+_RE_TYPE = re.compile(r'card__type|type|tipologia', re.I)
+_RE_LOCATION = re.compile(r'card__location|location|localizacao|morada', re.I)
+_RE_CARD_PRICE = re.compile(r'price|valor|card__price', re.I)
+_RE_PRICE = re.compile(r'price|valor', re.I)
+_RE_EURO_AMOUNT = re.compile(r'[\d.,]+\s*€', re.I)
 
 def parse_era(html_content):
     """
@@ -11,26 +27,25 @@ def parse_era(html_content):
       - span/div with class 'card__price' or 'price-value' for prices
       - h3/h4 or spans with location/type info for titles
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml')
     properties = []
     seen_ids = set()
 
     # Primary strategy: Find links to property detail pages
-    property_links = soup.find_all('a', href=re.compile(r'/imovel/', re.I))
+    property_links = soup.find_all('a', href=_RE_IMOVEL_HREF)
     
     for link in property_links:
         try:
             url = link['href']
-            if not url.startswith('http'):
-                url = "https://www.era.pt" + url
+            url = abs_url('era', url)
             
             # Extract property ID from URL: /imovel/venda-apartamento-.../123456
-            id_match = re.search(r'/(\d{4,})(?:\?|$|#)', url)
+            id_match = _RE_TRAIL_ID.search(url)
             if not id_match:
                 # Try from URL path segments
-                id_match = re.search(r'/imovel/[^/]+/(\d+)', url)
+                id_match = _RE_PATH_ID.search(url)
             
-            prop_id = id_match.group(1) if id_match else hashlib.md5(url.encode()).hexdigest()
+            prop_id = id_match.group(1) if id_match else stable_id(url)
             
             # Skip if already seen (multiple links per card)
             if prop_id in seen_ids:
@@ -38,7 +53,7 @@ def parse_era(html_content):
             seen_ids.add(prop_id)
             
             # Navigate up to find the card container
-            card = link.find_parent('div', class_=re.compile(r'card|listing|property', re.I))
+            card = link.find_parent('div', class_=_RE_CARD_PARENT)
             if not card:
                 card = link.parent
                 for _ in range(5):
@@ -58,35 +73,35 @@ def parse_era(html_content):
             if card:
                 title_tag = card.find(['h2', 'h3', 'h4'])
                 if title_tag:
-                    title = title_tag.get_text(strip=True)
+                    title = fast_text(title_tag)
                 
                 if not title or len(title) < 5:
                     # Look for card__type and card__location classes
-                    type_el = card.find(class_=re.compile(r'card__type|type|tipologia', re.I))
-                    loc_el = card.find(class_=re.compile(r'card__location|location|localizacao|morada', re.I))
+                    type_el = card.find(class_=_RE_TYPE)
+                    loc_el = card.find(class_=_RE_LOCATION)
                     
                     parts = []
                     if type_el:
-                        parts.append(type_el.get_text(strip=True))
+                        parts.append(fast_text(type_el))
                     if loc_el:
-                        parts.append(loc_el.get_text(strip=True))
+                        parts.append(fast_text(loc_el))
                     if parts:
                         title = ' - '.join(parts)
             
             if not title or len(title) < 5:
-                title = link.get('title', '') or link.get_text(strip=True)[:100]
+                title = link.get('title', '') or fast_text(link)[:100]
             if not title or len(title) < 3:
                 title = "ERA Property"
             
             # Price
             price = "N/A"
             if card:
-                price_tag = card.find(class_=re.compile(r'price|valor|card__price', re.I))
+                price_tag = card.find(class_=_RE_CARD_PRICE)
                 if price_tag:
-                    price = price_tag.get_text(strip=True)
+                    price = fast_text(price_tag)
                 else:
                     # Look for € symbol
-                    price_text = card.find(string=re.compile(r'[\d.,]+\s*€', re.I))
+                    price_text = card.find(string=_RE_EURO_AMOUNT)
                     if price_text:
                         price = price_text.strip()
             
@@ -94,19 +109,20 @@ def parse_era(html_content):
             if 'agencia' in url.lower() or '/comprar' == url.rstrip('/').lower():
                 continue
             
-            properties.append({
-                'id': str(prop_id),
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'era'
-            })
-        except Exception:
+            properties.append(Listing(
+                id=str(prop_id),
+                title=title,
+                url=url,
+                price=price,
+                site='era'
+            ))
+        except Exception as e:
+            logger.debug("Erro ao processar um item da ERA: %s", e)
             continue
     
     # Fallback: If no property links found, try card-based approach
     if not properties:
-        listings = soup.find_all('div', class_=re.compile(r'card', re.I))
+        listings = soup.find_all('div', class_=_RE_CARD)
         for item in listings:
             try:
                 link_tag = item.find('a', href=True)
@@ -116,28 +132,28 @@ def parse_era(html_content):
                 url = link_tag['href']
                 if '/imovel/' not in url.lower():
                     continue
-                if not url.startswith('http'):
-                    url = "https://www.era.pt" + url
+                url = abs_url('era', url)
                 
                 title_tag = item.find(['h2', 'h3', 'h4'])
-                title = title_tag.get_text(strip=True) if title_tag else "ERA Property"
+                title = fast_text(title_tag) if title_tag else "ERA Property"
                 
-                price_tag = item.find(class_=re.compile(r'price|valor', re.I))
-                price = price_tag.get_text(strip=True) if price_tag else "N/A"
+                price_tag = item.find(class_=_RE_PRICE)
+                price = fast_text(price_tag) if price_tag else "N/A"
                 
-                id_match = re.search(r'/(\d{4,})', url)
-                prop_id = id_match.group(1) if id_match else hashlib.md5(url.encode()).hexdigest()
+                id_match = _RE_ANY_ID.search(url)
+                prop_id = id_match.group(1) if id_match else stable_id(url)
                 
                 if prop_id not in seen_ids:
                     seen_ids.add(prop_id)
-                    properties.append({
-                        'id': str(prop_id),
-                        'title': title,
-                        'url': url,
-                        'price': price,
-                        'site': 'era'
-                    })
-            except Exception:
+                    properties.append(Listing(
+                        id=str(prop_id),
+                        title=title,
+                        url=url,
+                        price=price,
+                        site='era'
+                    ))
+            except Exception as e:
+                logger.debug("Erro ao processar um item da ERA: %s", e)
                 continue
             
     return properties
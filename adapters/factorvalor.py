@@ -1,52 +1,75 @@
-from bs4 import BeautifulSoup
+import logging
 import re
-import hashlib
+from lxml import etree
+from adapters._util import parse_html, element_text, first, class_contains, has_class, stable_id, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_TRAIL_ID = re.compile(r'/(\d+)$')
+
+_XP_LISTINGS = etree.XPath(f"//div[{class_contains('propertyItem')}]")
+_XP_LINK = etree.XPath(f".//a[{class_contains('propertyItemWrap')}]")
+_XP_TITLE = etree.XPath(f".//span[{has_class('box-title')}]")
+_XP_TITLE_ALT = etree.XPath(f".//h2[{has_class('propertyTitle')}]")
+_XP_PRICE = etree.XPath(f".//div[{has_class('propertyPrice')}]")
+_XP_PRICE_ALT = etree.XPath(f".//*[{class_contains('price', 'valor')}]")
 
 def parse_factorvalor(html_content):
     """
     Parser for factorvalor.pt.
     The listing container is an <a> tag with class 'propertyItemWrap'.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    tree = parse_html(html_content)
     properties = []
+    seen_ids = set()
+    if tree is None:
+        return properties
     
     # Listings are wrapped in 'propertyItem' divs
-    listings = soup.find_all('div', class_=re.compile(r'propertyItem', re.I))
+    listings = _XP_LISTINGS(tree)
     
     for item in listings:
         try:
-            link_tag = item.find('a', class_=re.compile(r'propertyItemWrap', re.I))
-            if not link_tag: continue
+            link_tag = first(item, _XP_LINK)
+            if link_tag is None: continue
             
             url = link_tag.get('href')
             if not url: continue
-            if not url.startswith('http'):
-                url = "https://www.factorvalor.pt" + url
+            url = abs_url('factorvalor', url)
             
             # Title
-            title_tag = item.find('span', class_='box-title') or item.find('h2', class_='propertyTitle')
-            title = title_tag.get_text(strip=True) if title_tag else "Imóvel FactorValor"
+            title_tag = first(item, _XP_TITLE)
+            if title_tag is None:
+                title_tag = first(item, _XP_TITLE_ALT)
+            title = element_text(title_tag) if title_tag is not None else "Imóvel FactorValor"
             
             # Price
-            price_tag = item.find('div', class_='propertyPrice') or \
-                        item.find(class_=re.compile(r'price|valor', re.I))
+            price_tag = first(item, _XP_PRICE)
+            if price_tag is None:
+                price_tag = first(item, _XP_PRICE_ALT)
             
-            price = price_tag.get_text(strip=True) if price_tag else "Preço sob consulta"
+            price = element_text(price_tag) if price_tag is not None else "Preço sob consulta"
             
             # ID extraction from data-stickeridentifier or URL
             prop_id = item.get('data-stickeridentifier')
             if not prop_id:
-                id_match = re.search(r'/(\d+)$', url.split('?')[0])
-                prop_id = id_match.group(1) if id_match else hashlib.md5(url.encode()).hexdigest()
+                id_match = _RE_TRAIL_ID.search(url.split('?')[0])
+                prop_id = id_match.group(1) if id_match else stable_id(url)
+
+            if prop_id in seen_ids:
+                continue
+            seen_ids.add(prop_id)
 
-            properties.append({
-                'id': str(prop_id),
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'factorvalor'
-            })
+            properties.append(Listing(
+                id=str(prop_id),
+                title=title,
+                url=url,
+                price=price,
+                site='factorvalor'
+            ))
         except Exception as e:
-            print(f"Erro ao processar um item de FactorValor: {e}")
+            logger.debug("Erro ao processar um item de FactorValor: %s", e)
+            continue
             
     return properties
@@ -1,14 +1,22 @@
-from bs4 import BeautifulSoup
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
 import re
-import hashlib
+from adapters._util import stable_id, fast_text
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+# Only build the listing cards; the rest of the page is skipped by the parser
+_STRAINER = SoupStrainer('div', class_='item-listing-wrap')
 
 def parse_franciscofaria(html_content):
     """
     Parser for franciscofaria.pt (Houzez Theme).
     Extracts property ID, title, URL, and price from search result cards.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=_STRAINER)
     properties = []
+    seen_ids = set()
     
     # Houzez theme listings
     listings = soup.find_all('div', class_='item-listing-wrap')
@@ -22,28 +30,33 @@ def parse_franciscofaria(html_content):
             title_tag = item.find('h2', class_='item-title') or item.find('h3', class_='item-title')
             link_tag = title_tag.find('a') if title_tag else item.find('a', href=True)
             
-            if not link_tag:
+            url = link_tag.get('href') if link_tag else None
+            if not url:
                 continue
                 
-            title = link_tag.get_text(strip=True) if link_tag else "Sem título"
-            url = link_tag['href'] if link_tag else ""
+            title = fast_text(link_tag)
             
             # Price
             price_tag = item.find('li', class_='item-price') or item.find(class_='item-price')
-            price = price_tag.get_text(strip=True) if price_tag else "Preço sob consulta"
+            price = fast_text(price_tag) if price_tag else "Preço sob consulta"
             
             if not prop_id and url:
-                prop_id = hashlib.md5(url.encode()).hexdigest()
+                prop_id = stable_id(url)
 
             if prop_id and url:
-                properties.append({
-                    'id': prop_id,
-                    'title': title,
-                    'url': url,
-                    'price': price,
-                    'site': 'franciscofaria'
-                })
+                if prop_id in seen_ids:
+                    continue
+                seen_ids.add(prop_id)
+
+                properties.append(Listing(
+                    id=prop_id,
+                    title=title,
+                    url=url,
+                    price=price,
+                    site='franciscofaria'
+                ))
         except Exception as e:
-            print(f"Erro ao processar um item de franciscofaria: {e}")
+            logger.debug("Erro ao processar um item de franciscofaria: %s", e)
+            continue
             
     return properties
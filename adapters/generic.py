@@ -1,20 +1,61 @@
 from bs4 import BeautifulSoup
 import re
 import urllib.parse
-import hashlib
+import logging
+from adapters._util import stable_id, fast_text
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
 
 BLACKLIST_KEYWORDS = [
     'facebook.com', 'whatsapp.com', 'twitter.com', 'pinterest.com', 
     'linkedin.com', 'share', 'messenger', 'mailto:', 'tel:', 
     'instagram.com', 'youtube.com'
 ]
+# All blacklist keywords in one alternation, so a URL is scanned once
+_RE_BLACKLIST = re.compile('|'.join(map(re.escape, BLACKLIST_KEYWORDS)), re.I)
+
+# Common containers for real estate listings (tag -> class pattern), in order of preference
+LISTING_PATTERNS = {
+    'article': re.compile(r'item|property|listing|card', re.I),
+    'div': re.compile(r'item|property|listing|card|product', re.I),
+    'li': re.compile(r'item|property|listing|card', re.I),
+}
+
+_RE_PROPERTY_HREF = re.compile(r'/imovel/|/p/|/propriedade/|/detalhe/|/venda/', re.I)
+_RE_TITLE = re.compile(r'title|name|header', re.I)
+# Currency written out in any case ('90 000 euros', 'Eur'), as a whole word only
+_RE_EUROS = re.compile(r'\beur(?:os?)?\b', re.I)
 
 def is_social_link(url):
     """
     Checks if a URL belongs to a social media platform or is a sharing link.
     """
-    url_lower = url.lower()
-    return any(keyword in url_lower for keyword in BLACKLIST_KEYWORDS)
+    return _RE_BLACKLIST.search(url) is not None
+
+def _is_price_text(text):
+    """
+    Matches text nodes that look like a price. The substring tests catch the
+    usual '€'/'EUR' cheaply; the word-bounded regex only runs on the rest, so
+    'euros' or 'Eur' still count but 'europa' does not.
+    """
+    return '€' in text or 'EUR' in text or _RE_EUROS.search(text) is not None
+
+def _find_listings(soup):
+    """
+    Collects the candidate containers for every LISTING_PATTERNS tag in a single
+    tree walk and returns the first group, in preference order, with at least 3 hits.
+    """
+    candidates = {tag: [] for tag in LISTING_PATTERNS}
+    for el in soup.find_all(list(LISTING_PATTERNS)):
+        classes = el.get('class')
+        if classes and LISTING_PATTERNS[el.name].search(' '.join(classes)):
+            candidates[el.name].append(el)
+
+    for found in candidates.values():
+        if len(found) >= 3: # Lowered threshold slightly
+            return found
+    return []
 
 def parse_generic_logic(html_content, base_url):
     """
@@ -22,22 +63,16 @@ def parse_generic_logic(html_content, base_url):
     Uses heuristic patterns (article/div class names like 'item', 'property') to 
     find property listings on unsupported sites.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml')
     properties = []
+    seen_ids = set()
+
+    # base_url is constant for the whole page; split it once instead of per item
+    base_parts = urllib.parse.urlsplit(base_url)
+    base_netloc = base_parts.netloc
+    base_origin = f"{base_parts.scheme}://{base_netloc}"
     
-    # Common containers for real estate listings
-    patterns = [
-        {'tag': 'article', 'class_': re.compile(r'item|property|listing|card', re.I)},
-        {'tag': 'div', 'class_': re.compile(r'item|property|listing|card|product', re.I)},
-        {'tag': 'li', 'class_': re.compile(r'item|property|listing|card', re.I)},
-    ]
-    
-    listings = []
-    for p in patterns:
-        found = soup.find_all(p['tag'], class_=p['class_'])
-        if len(found) >= 3: # Lowered threshold slightly
-            listings = found
-            break
+    listings = _find_listings(soup)
             
     if not listings:
         # Fallback: look for all links that might be dynamic property links
@@ -45,7 +80,7 @@ def parse_generic_logic(html_content, base_url):
         # Filter typical "property" links but exclude social ones
         potential_links = [
             l for l in all_links 
-            if re.search(r'/imovel/|/p/|/propriedade/|/detalhe/|/venda/', l['href'], re.I)
+            if _RE_PROPERTY_HREF.search(l['href'])
             and not is_social_link(l['href'])
         ]
         # This is a bit too broad for generic, but helpful if structure is unknown
@@ -60,7 +95,7 @@ def parse_generic_logic(html_content, base_url):
             
             if not link_tag: continue
             
-            url = link_tag['href']
+            url = link_tag.get('href') or ""
             if is_social_link(url):
                 continue
 
@@ -70,21 +105,28 @@ def parse_generic_logic(html_content, base_url):
                 continue
 
             if url and not url.startswith('http'):
-                url = urllib.parse.urljoin(base_url, url)
+                if url.startswith('/') and not url.startswith('//') and '/.' not in url:
+                    # Root-relative link: same result as urljoin, without the parsing
+                    url = base_origin + url
+                else:
+                    try:
+                        url = urllib.parse.urljoin(base_url, url)
+                    except ValueError: # e.g. an unbalanced IPv6 bracket in the href
+                        continue
             
             # Title
-            title_tag = item.find(['h2', 'h3', 'h4', 'span'], class_=re.compile(r'title|name|header', re.I))
+            title_tag = item.find(['h2', 'h3', 'h4', 'span'], class_=_RE_TITLE)
             if not title_tag:
                 title_tag = item.find(['h2', 'h3', 'h4'])
-            title = title_tag.get_text(strip=True) if title_tag else "Imóvel"
+            title = fast_text(title_tag) if title_tag else "Imóvel"
             
             if len(title) < 5: # Skip very short titles (noise)
                 continue
 
             # Price
-            price_tag = item.find(string=re.compile(r'€|EUR|\d+[\.,]\d+\s?€', re.I))
+            price_tag = item.find(string=_is_price_text)
             if price_tag and price_tag.parent:
-                price = price_tag.parent.get_text(strip=True)
+                price = fast_text(price_tag.parent)
             else:
                 # If no price is found, the likelihood of it being a listing in this generic parser is lower
                 # but we'll still keep it if it's broad enough. 
@@ -97,19 +139,25 @@ def parse_generic_logic(html_content, base_url):
             # ID
             prop_id = item.get('id') or item.get('data-id') or item.get('data-ad-id')
             if not prop_id:
-                # Use a mix of URL path and hex hash for better consistency
+                # Use a mix of URL path and hex hash for better consistency.
+                # urlparse (not urlsplit) so ';params' stay out of the ID, as before.
                 path = urllib.parse.urlparse(url).path
-                prop_id = f"gen_{hashlib.md5(path.encode()).hexdigest()}"
+                prop_id = f"gen_{stable_id(path)}"
 
             if url and prop_id:
-                properties.append({
-                    'id': prop_id,
-                    'title': title,
-                    'url': url,
-                    'price': price,
-                    'site': urllib.parse.urlparse(base_url).netloc
-                })
-        except Exception:
+                if prop_id in seen_ids:
+                    continue
+                seen_ids.add(prop_id)
+
+                properties.append(Listing(
+                    id=prop_id,
+                    title=title,
+                    url=url,
+                    price=price,
+                    site=base_netloc
+                ))
+        except Exception as e:
+            logger.debug("Erro ao processar um item de %s: %s", base_url, e)
             continue
             
     return properties
@@ -1,57 +1,145 @@
-from bs4 import BeautifulSoup
+import logging
 import re
-import hashlib
+from lxml import etree
+from adapters import _rawhtml
+from adapters._util import parse_html, element_text, first, has_class, stable_id, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_IMOVEL_ID = re.compile(r'/imovel/(\d+)')
+
+# Compiled once at import; the adapter runs these on every card of every page
+_XP_LISTINGS = etree.XPath("//article[contains(@class, 'item')]")
+_XP_LINK = etree.XPath(f".//a[{has_class('item-link')}]")
+_XP_ANY_LINK = etree.XPath('.//a[@href]')
+_XP_PRICE = etree.XPath(".//*[contains(@class, 'item-price')]")
+
+def _is_item(attrs):
+    return 'item' in attrs.get('class', '')
+
+def _is_item_link(attrs):
+    return 'item-link' in _rawhtml.class_tokens(attrs)
+
+def _has_href(attrs):
+    return 'href' in attrs
+
+def _is_price(attrs):
+    return 'item-price' in attrs.get('class', '')
+
+def _make_listing(prop_id, title, href, price):
+    """
+    Builds the Listing from a card's raw fields. Both the raw-HTML and the DOM
+    path go through here, so a card gets the same URL and ID whichever ran.
+    """
+    url = abs_url('idealista', href)
+    if not prop_id and url:
+        # Try to extract ID from URL (e.g., /imovel/12345678/)
+        match = _RE_IMOVEL_ID.search(url)
+        if match:
+            prop_id = match.group(1)
+        else:
+            prop_id = stable_id(url)
+    return Listing(
+        id=prop_id,
+        title=title,
+        url=url,
+        price=price,
+        site='idealista'
+    )
+
+def _parse_idealista_fast(html_content):
+    """
+    Reads the article.item results straight from the raw HTML, without building a tree.
+    Returns None when no card is found or the markup is not what we expect.
+    """
+    properties = []
+    seen_ids = set()
+    try:
+        for item_attrs, item in _rawhtml.iter_elements(html_content, 'article', _is_item, hint='item'):
+            # Skip ads
+            if 'item-ad' in _rawhtml.class_tokens(item_attrs):
+                continue
+
+            link = _rawhtml.find_element(item, 'a', _is_item_link, hint='item-link')
+            if link is None:
+                link = _rawhtml.find_element(item, 'a', _has_href)
+
+            if link is not None:
+                link_attrs, link_html = link
+                title = link_attrs.get('title') or _rawhtml.text(link_html)
+                href = link_attrs.get('href', "")
+            else:
+                title = "Sem título"
+                href = ""
+
+            price_el = _rawhtml.find_element(item, r'[a-zA-Z][\w-]*', _is_price, hint='item-price')
+            price = _rawhtml.text(price_el[1]) if price_el else "Preço sob consulta"
+
+            prop_id = item_attrs.get('data-ad-id') or item_attrs.get('data-element-id')
+            prop = _make_listing(prop_id, title, href, price)
+            if prop.id in seen_ids:
+                continue
+            seen_ids.add(prop.id)
+            properties.append(prop)
+    except ValueError:
+        return None
+    return properties or None
+
+def _extract_idealista(item):
+    """
+    Reads one result card; None when it has to be skipped.
+    """
+    # Skip ads
+    if 'item-ad' in item.get('class', '').split():
+        return None
+
+    # Title and Link
+    link_tag = first(item, _XP_LINK)
+    if link_tag is None:
+        link_tag = first(item, _XP_ANY_LINK)
+
+    title = link_tag.get('title') or element_text(link_tag) if link_tag is not None else "Sem título"
+    href = link_tag.get('href', "") if link_tag is not None else ""
+
+    # Price
+    price_tag = first(item, _XP_PRICE)
+    price = element_text(price_tag) if price_tag is not None else "Preço sob consulta"
+
+    # ID from data-ad-id or data-element-id
+    prop_id = item.get('data-ad-id') or item.get('data-element-id')
+    return _make_listing(prop_id, title, href, price)
 
 def parse_idealista(html_content):
     """
     Parser for Idealista.pt listings.
     Targets 'article' elements with the 'item' class. Includes logic to skip advertisement blocks.
+    The card template is stable, so the raw HTML is scanned first; the lxml
+    tree is only built when that finds nothing.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    if isinstance(html_content, str):
+        properties = _parse_idealista_fast(html_content)
+        if properties is not None:
+            return properties
+
+    tree = parse_html(html_content)
     properties = []
+    seen_ids = set()
+    if tree is None:
+        return properties
     
     # Idealista listings are usually in 'article' tags with class 'item'
-    listings = soup.find_all('article', class_=re.compile(r'item'))
+    listings = _XP_LISTINGS(tree)
     
     for item in listings:
         try:
-            # Skip ads
-            if 'item-ad' in item.get('class', []):
+            prop = _extract_idealista(item)
+            if prop is None or prop.id in seen_ids:
                 continue
-                
-            # Extract ID from data-ad-id or data-element-id
-            prop_id = item.get('data-ad-id') or item.get('data-element-id')
-            
-            # Title and Link
-            link_tag = item.find('a', class_='item-link')
-            if not link_tag:
-                link_tag = item.find('a', href=True)
-                
-            title = link_tag.get('title') or link_tag.get_text(strip=True) if link_tag else "Sem título"
-            url = link_tag['href'] if link_tag else ""
-            if url and not url.startswith('http'):
-                url = "https://www.idealista.pt" + url
-            
-            # Price
-            price_tag = item.find(class_=re.compile(r'item-price'))
-            price = price_tag.get_text(strip=True) if price_tag else "Preço sob consulta"
-
-            if not prop_id and url:
-                # Try to extract ID from URL (e.g., /imovel/12345678/)
-                match = re.search(r'/imovel/(\d+)', url)
-                if match:
-                    prop_id = match.group(1)
-                else:
-                    prop_id = hashlib.md5(url.encode()).hexdigest()
-
-            properties.append({
-                'id': prop_id,
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'idealista'
-            })
+            seen_ids.add(prop.id)
+            properties.append(prop)
         except Exception as e:
-            print(f"Erro ao processar um item do Idealista: {e}")
+            logger.debug("Erro ao processar um item do Idealista: %s", e)
+            continue
             
     return properties
@@ -1,59 +1,96 @@
-from bs4 import BeautifulSoup
+import logging
 import re
-import hashlib
+from lxml import etree
+from adapters._util import parse_html, element_text, first, stable_id, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_IMOVIRTUAL_ID = re.compile(r'-ID([a-zA-Z0-9]+)$')
+
+# Compiled once at import; the adapter runs these on every card of every page
+_XP_ADVERT_CARDS = etree.XPath('//article[@data-sentry-component="AdvertCard"]')
+_XP_LISTING_ADS = etree.XPath('//article[@data-testid="listing-ad"]')
+_XP_LISTING_ITEMS = etree.XPath('//article[@data-testid="listing-item"]')
+_XP_LINK = etree.XPath('.//a[@data-cy="listing-item-link"]')
+_XP_ANY_LINK = etree.XPath('.//a[@href]')
+_XP_TITLE = etree.XPath('.//p[@data-cy="listing-item-title"]')
+_XP_TITLE_ALT = etree.XPath('.//h3')
+_XP_PRICE = etree.XPath('.//span[@data-testid="listing-item-price"]')
+_XP_PRICE_ALT = etree.XPath(".//*[self::span or self::p][contains(., '€')]")
+
+def _extract_imovirtual(item):
+    """
+    Reads one result card; None when it has to be skipped.
+    """
+    # Title and URL mapping - New structure uses data-cy attributes
+    link_tag = first(item, _XP_LINK)
+    if link_tag is None:
+        link_tag = first(item, _XP_ANY_LINK)
+    if link_tag is None:
+        return None
+
+    url = link_tag.get('href')
+    if url is None:
+        return None
+    url = abs_url('imovirtual', url)
+
+    title_tag = first(item, _XP_TITLE)
+    if title_tag is None:
+        title_tag = first(item, _XP_TITLE_ALT)
+    if title_tag is None:
+        title_tag = link_tag
+    title = element_text(title_tag)
+
+    # Price
+    price_container = first(item, _XP_PRICE)
+    if price_container is None:
+        price_container = first(item, _XP_PRICE_ALT)
+
+    price = element_text(price_container) if price_container is not None else "Preço sob consulta"
+
+    # Prop ID extraction from URL (e.g., ...-ID1hDdP)
+    prop_id = None
+    id_match = _RE_IMOVIRTUAL_ID.search(url)
+    if id_match:
+        prop_id = id_match.group(1)
+    else:
+        prop_id = item.get('id') or item.get('data-item-id') or stable_id(url)
+
+    return Listing(
+        id=prop_id,
+        title=title,
+        url=url,
+        price=price,
+        site='imovirtual'
+    )
 
 def parse_imovirtual(html_content):
     """
     Parser for Imovirtual.com listings.
     Identifies 'article' tags with 'data-testid="listing-item"' and extracts ID, title, URL, and price.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    tree = parse_html(html_content)
     properties = []
+    seen_ids = set()
+    if tree is None:
+        return properties
     
     # Imovirtual listings are usually in 'article' tags with data-testid="listing-item"
     # New structure uses data-sentry-component="AdvertCard" or data-testid="listing-ad"
-    listings = soup.find_all('article', {'data-sentry-component': 'AdvertCard'}) or \
-               soup.find_all('article', {'data-testid': 'listing-ad'}) or \
-               soup.find_all('article', {'data-testid': 'listing-item'})
+    listings = _XP_ADVERT_CARDS(tree) or \
+               _XP_LISTING_ADS(tree) or \
+               _XP_LISTING_ITEMS(tree)
     
     for item in listings:
         try:
-            # Title and URL mapping - New structure uses data-cy attributes
-            link_tag = item.find('a', {'data-cy': 'listing-item-link'}) or item.find('a', href=True)
-            if not link_tag:
+            prop = _extract_imovirtual(item)
+            if prop is None or prop.id in seen_ids:
                 continue
-
-            url = link_tag['href']
-            if url and not url.startswith('http'):
-                url = "https://www.imovirtual.com" + url
-
-            title_tag = item.find('p', {'data-cy': 'listing-item-title'}) or \
-                        item.find('h3') or \
-                        link_tag
-            title = title_tag.get_text(strip=True) if title_tag else "Sem título"
-            
-            # Price
-            price_container = item.find('span', {'data-testid': 'listing-item-price'}) or \
-                              item.find(lambda tag: tag.name in ['span', 'p'] and '€' in tag.get_text())
-            
-            price = price_container.get_text(strip=True) if price_container else "Preço sob consulta"
-
-            # Prop ID extraction from URL (e.g., ...-ID1hDdP)
-            prop_id = None
-            id_match = re.search(r'-ID([a-zA-Z0-9]+)$', url)
-            if id_match:
-                prop_id = id_match.group(1)
-            else:
-                prop_id = item.get('id') or item.get('data-item-id') or hashlib.md5(url.encode()).hexdigest()
-
-            properties.append({
-                'id': prop_id,
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'imovirtual'
-            })
+            seen_ids.add(prop.id)
+            properties.append(prop)
         except Exception as e:
-            print(f"Erro ao processar um item de Imovirtual: {e}")
+            logger.debug("Erro ao processar um item de Imovirtual: %s", e)
+            continue
             
     return properties
@@ -1,6 +1,19 @@
+import logging
 from bs4 import BeautifulSoup
 import re
-import hashlib
+from adapters._util import fast_text, stable_id, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_PROPERTY_HREF = re.compile(r'/imovel/.*propertyId=\d+', re.I)
+_RE_PROPERTY_ID = re.compile(r'propertyId=(\d+)')
+_RE_SLUG = re.compile(r'/imovel/([^/?]+)')
+_RE_BUSINESS_SUFFIX = re.compile(r'\s+(Compra|Arrendamento)\s*$', re.I)
+_RE_CARD = re.compile(r'destaque-box-wrapper', re.I)
+_RE_OVERLAY_PRICE = re.compile(r'overlay-price-wrapper|price', re.I)
+_RE_PRICE = re.compile(r'price|overlay-price', re.I)
+_RE_EURO_AMOUNT = re.compile(r'[\d.,]+\s*€', re.I)
 
 def parse_lardesonho(html_content):
     """
@@ -11,22 +24,21 @@ def parse_lardesonho(html_content):
       - Prices in div.overlay-price-wrapper
       - Titles extracted from URL slugs (e.g., Apartamento-T2-Vila-Boa-Barcelos-Compra)
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml')
     properties = []
     seen_ids = set()
 
     # Find all property links
-    property_links = soup.find_all('a', href=re.compile(r'/imovel/.*propertyId=\d+', re.I))
+    property_links = soup.find_all('a', href=_RE_PROPERTY_HREF)
     
     for link in property_links:
         try:
             url = link['href']
-            if not url.startswith('http'):
-                url = "https://www.lardesonho.pt" + url
+            url = abs_url('lardesonho', url)
             
             # Extract propertyId from URL
-            id_match = re.search(r'propertyId=(\d+)', url)
-            prop_id = id_match.group(1) if id_match else hashlib.md5(url.encode()).hexdigest()
+            id_match = _RE_PROPERTY_ID.search(url)
+            prop_id = id_match.group(1) if id_match else stable_id(url)
             
             # Skip duplicates (multiple links per card)
             if prop_id in seen_ids:
@@ -35,13 +47,13 @@ def parse_lardesonho(html_content):
             
             # Extract title from URL slug
             # URL: /imovel/Apartamento-T2-Vila-Boa-Barcelos-Compra/?propertyId=4443963
-            slug_match = re.search(r'/imovel/([^/?]+)', url)
+            slug_match = _RE_SLUG.search(url)
             if slug_match:
                 slug = slug_match.group(1)
                 # Convert hyphens to spaces for readable title
                 title = slug.replace('-', ' ')
                 # Remove trailing "Compra" or "Arrendamento"
-                title = re.sub(r'\s+(Compra|Arrendamento)\s*$', '', title, flags=re.I)
+                title = _RE_BUSINESS_SUFFIX.sub('', title)
             else:
                 title = "Lar de Sonho Property"
             
@@ -52,30 +64,31 @@ def parse_lardesonho(html_content):
                 if container is None:
                     break
                 # Check for price element
-                price_el = container.find(class_=re.compile(r'overlay-price-wrapper|price', re.I))
+                price_el = container.find(class_=_RE_OVERLAY_PRICE)
                 if price_el:
-                    price = price_el.get_text(strip=True)
+                    price = fast_text(price_el)
                     break
                 # Also check for € in text
-                price_text = container.find(string=re.compile(r'[\d.,]+\s*€', re.I))
+                price_text = container.find(string=_RE_EURO_AMOUNT)
                 if price_text:
                     price = price_text.strip()
                     break
                 container = container.parent
             
-            properties.append({
-                'id': prop_id,
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'lardesonho'
-            })
-        except Exception:
+            properties.append(Listing(
+                id=prop_id,
+                title=title,
+                url=url,
+                price=price,
+                site='lardesonho'
+            ))
+        except Exception as e:
+            logger.debug("Erro ao processar um item de Lar de Sonho: %s", e)
             continue
     
     # Fallback: try finding cards by container class
     if not properties:
-        cards = soup.find_all('div', class_=re.compile(r'destaque-box-wrapper', re.I))
+        cards = soup.find_all('div', class_=_RE_CARD)
         for card in cards:
             try:
                 link_tag = card.find('a', href=True)
@@ -83,30 +96,30 @@ def parse_lardesonho(html_content):
                     continue
                 
                 url = link_tag['href']
-                if not url.startswith('http'):
-                    url = "https://www.lardesonho.pt" + url
+                url = abs_url('lardesonho', url)
                 
-                id_match = re.search(r'propertyId=(\d+)', url)
-                prop_id = id_match.group(1) if id_match else hashlib.md5(url.encode()).hexdigest()
+                id_match = _RE_PROPERTY_ID.search(url)
+                prop_id = id_match.group(1) if id_match else stable_id(url)
                 
                 if prop_id in seen_ids:
                     continue
                 seen_ids.add(prop_id)
                 
                 title_tag = card.find(['h2', 'h3', 'h4', 'h5'])
-                title = title_tag.get_text(strip=True) if title_tag else "Lar de Sonho Property"
+                title = fast_text(title_tag) if title_tag else "Lar de Sonho Property"
                 
-                price_tag = card.find(class_=re.compile(r'price|overlay-price', re.I))
-                price = price_tag.get_text(strip=True) if price_tag else "N/A"
+                price_tag = card.find(class_=_RE_PRICE)
+                price = fast_text(price_tag) if price_tag else "N/A"
                 
-                properties.append({
-                    'id': prop_id,
-                    'title': title,
-                    'url': url,
-                    'price': price,
-                    'site': 'lardesonho'
-                })
-            except Exception:
+                properties.append(Listing(
+                    id=prop_id,
+                    title=title,
+                    url=url,
+                    price=price,
+                    site='lardesonho'
+                ))
+            except Exception as e:
+                logger.debug("Erro ao processar um item de Lar de Sonho: %s", e)
                 continue
     
     return properties
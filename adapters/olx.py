@@ -1,47 +1,117 @@
-from bs4 import BeautifulSoup
-import re
-import hashlib
+import logging
+from lxml import etree
+from adapters import _rawhtml
+from adapters._util import parse_html, element_text, first, stable_id, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+# Compiled once at import; the adapter runs these on every card of every page
+_XP_LISTINGS = etree.XPath('//div[@data-testid="l-card"]')
+_XP_LINK = etree.XPath('.//a[@href]')
+_XP_TITLE = etree.XPath('.//h6')
+_XP_PRICE = etree.XPath('.//p[@data-testid="ad-price"]')
+
+def _is_card(attrs):
+    return attrs.get('data-testid') == 'l-card'
+
+def _has_href(attrs):
+    return 'href' in attrs
+
+def _is_price(attrs):
+    return attrs.get('data-testid') == 'ad-price'
+
+def _make_listing(prop_id, title, href, price):
+    """
+    Builds the Listing from a card's raw fields. Both the raw-HTML and the DOM
+    path go through here, so a card gets the same URL and ID whichever ran.
+    """
+    url = abs_url('olx', href)
+    if not prop_id and url:
+        prop_id = stable_id(url)
+    return Listing(
+        id=prop_id,
+        title=title,
+        url=url,
+        price=price,
+        site='olx'
+    )
+
+def _parse_olx_fast(html_content):
+    """
+    Reads the l-card results straight from the raw HTML, without building a tree.
+    Returns None when no card is found or the markup is not what we expect.
+    """
+    properties = []
+    seen_ids = set()
+    try:
+        for card_attrs, card in _rawhtml.iter_elements(html_content, 'div', _is_card, hint='l-card'):
+            link = _rawhtml.find_element(card, 'a', _has_href)
+            href = link[0]['href'] if link else ""
+
+            title_el = _rawhtml.find_element(card, 'h6')
+            title = _rawhtml.text(title_el[1]) if title_el else "Sem título"
+
+            price_el = _rawhtml.find_element(card, 'p', _is_price, hint='ad-price')
+            price = _rawhtml.text(price_el[1]) if price_el else "Preço não disponível"
+
+            prop = _make_listing(card_attrs.get('id'), title, href, price)
+            if prop.id in seen_ids:
+                continue
+            seen_ids.add(prop.id)
+            properties.append(prop)
+    except ValueError:
+        return None
+    return properties or None
+
+def _extract_olx(item):
+    """
+    Reads one result card; None when it has to be skipped.
+    """
+    # Link and Title
+    link_tag = first(item, _XP_LINK)
+    href = link_tag.get('href') if link_tag is not None else ""
+
+    title_tag = first(item, _XP_TITLE)
+    title = element_text(title_tag) if title_tag is not None else "Sem título"
+
+    # Price
+    price_tag = first(item, _XP_PRICE)
+    price = element_text(price_tag) if price_tag is not None else "Preço não disponível"
+
+    # ID from the id attribute
+    return _make_listing(item.get('id'), title, href, price)
 
 def parse_olx(html_content):
     """
     Parser for OLX.pt listings.
     Targets elements with 'data-testid="l-card"' and extracts property details.
+    The card template is stable, so the raw HTML is scanned first; the lxml
+    tree is only built when that finds nothing.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    if isinstance(html_content, str):
+        properties = _parse_olx_fast(html_content)
+        if properties is not None:
+            return properties
+
+    tree = parse_html(html_content)
     properties = []
+    seen_ids = set()
+    if tree is None:
+        return properties
     
     # OLX listings are in cards with data-testid="l-card"
-    listings = soup.find_all('div', {'data-testid': 'l-card'})
+    listings = _XP_LISTINGS(tree)
     
     for item in listings:
         try:
-            # Extract ID from id attribute
-            prop_id = item.get('id')
-            
-            # Link and Title
-            link_tag = item.find('a', href=True)
-            url = link_tag['href'] if link_tag else ""
-            if url and not url.startswith('http'):
-                url = "https://www.olx.pt" + url
-            
-            title_tag = item.find('h6')
-            title = title_tag.get_text(strip=True) if title_tag else "Sem título"
-            
-            # Price
-            price_tag = item.find('p', {'data-testid': 'ad-price'})
-            price = price_tag.get_text(strip=True) if price_tag else "Preço não disponível"
-
-            if not prop_id and url:
-                prop_id = hashlib.md5(url.encode()).hexdigest()
-
-            properties.append({
-                'id': prop_id,
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'olx'
-            })
+            prop = _extract_olx(item)
+            if prop is None or prop.id in seen_ids:
+                continue
+            seen_ids.add(prop.id)
+            properties.append(prop)
         except Exception as e:
-            print(f"Erro ao processar um item do OLX: {e}")
+            logger.debug("Erro ao processar um item do OLX: %s", e)
+            continue
             
     return properties
@@ -1,7 +1,21 @@
+import logging
 from bs4 import BeautifulSoup
 import re
-import json
-import hashlib
+from adapters._util import loads_json, fast_text, stable_id, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_LISTING_TESTID = re.compile(r'listing', re.I)
+_RE_LISTING_CARD = re.compile(r'listing-card|ListingCard|result-card|property-card', re.I)
+_RE_LISTING_HREF = re.compile(r'/imoveis/venda[^"]*?/\d+-\d+', re.I)
+_RE_ID = re.compile(r'/(\d+-\d+)')
+_RE_TRAIL_ID = re.compile(r'/(\d+-\d+)$')
+_RE_SLUG = re.compile(r'/imoveis/([\w-]+)/\d+-\d+$')
+_RE_BUSINESS_PREFIX = re.compile(r'^(venda|comprar)-')
+_RE_TYPOLOGY = re.compile(r'\bT(\d)')
+_RE_PRICE_TEXT = re.compile(r'([\d]+[\s.\u00a0]?[\d]{3}[\s.\u00a0]?[\d]*)\s*€')
+_RE_EURO_AMOUNT = re.compile(r'[\d.,]+\s*€', re.I)
 
 def parse_remax(html_content):
     """
@@ -10,14 +24,15 @@ def parse_remax(html_content):
       1. Try '__NEXT_DATA__' JSON extraction (initialSearchResultsInfo.results)
       2. Fallback to rendered DOM parsing (listing cards)
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml')
     properties = []
+    seen_ids = set()
     
     # Strategy 1: Extract from __NEXT_DATA__ JSON (Next.js SSR/SSG)
     next_data = soup.find('script', id='__NEXT_DATA__')
     if next_data:
         try:
-            data = json.loads(next_data.string)
+            data = loads_json(next_data.string)
             page_props = data.get('props', {}).get('pageProps', {})
             
             # The results are nested in initialSearchResultsInfo.results
@@ -45,8 +60,7 @@ def parse_remax(html_content):
                     
                     # URL construction
                     url = item.get('detailUrl', '') or item.get('url', '')
-                    if url and not url.startswith('http'):
-                        url = "https://www.remax.pt" + url
+                    url = abs_url('remax', url)
                     
                     # Price - handle both numeric and string formats
                     price_raw = item.get('price', item.get('priceLabel', 'N/A'))
@@ -55,56 +69,63 @@ def parse_remax(html_content):
                     else:
                         price = str(price_raw)
                     
-                    if listing_id or url:
-                        properties.append({
-                            'id': listing_id or hashlib.md5(url.encode()).hexdigest(),
-                            'title': title,
-                            'url': url,
-                            'price': price,
-                            'site': 'remax'
-                        })
+                    if not (listing_id or url):
+                        continue
+                    prop_id = listing_id or stable_id(url)
+                    if prop_id in seen_ids:
+                        continue
+                    seen_ids.add(prop_id)
+
+                    properties.append(Listing(
+                        id=prop_id,
+                        title=title,
+                        url=url,
+                        price=price,
+                        site='remax'
+                    ))
                 
                 if properties:
                     return properties
-        except Exception:
+        except Exception as e:
+            logger.debug("Erro ao ler o __NEXT_DATA__ da Remax: %s", e)
             pass
 
     # Strategy 2: Parse rendered DOM (client-side rendered content)
     # RE/MAX uses various card structures depending on version
-    listings = soup.find_all('div', attrs={'data-testid': re.compile(r'listing', re.I)})
+    listings = soup.find_all('div', attrs={'data-testid': _RE_LISTING_TESTID})
     
     if not listings:
         # Try broader selectors for rendered listing cards
-        listings = soup.find_all('div', class_=re.compile(r'listing-card|ListingCard|result-card|property-card', re.I))
+        listings = soup.find_all('div', class_=_RE_LISTING_CARD)
     
     if not listings:
         # Try finding links to property detail pages
-        property_links = soup.find_all('a', href=re.compile(r'/imoveis/venda[^"]*?/\d+-\d+', re.I))
+        property_links = soup.find_all('a', href=_RE_LISTING_HREF)
         for link in property_links:
             try:
                 url = link['href']
-                if not url.startswith('http'):
-                    url = "https://www.remax.pt" + url
+                url = abs_url('remax', url)
 
                 # Extract ID from URL (e.g., 125681105-29)
-                id_match = re.search(r'/(\d+-\d+)$', url)
-                prop_id = id_match.group(1) if id_match else hashlib.md5(url.encode()).hexdigest()
+                id_match = _RE_TRAIL_ID.search(url)
+                prop_id = id_match.group(1) if id_match else stable_id(url)
 
                 # Avoid duplicates
-                if any(p['id'] == prop_id for p in properties):
+                if prop_id in seen_ids:
                     continue
+                seen_ids.add(prop_id)
 
                 # Extract title from URL slug (more reliable than DOM text)
                 # URL: /pt/imoveis/venda-apartamento-t3-barcelos-martim/125681105-29
-                slug_match = re.search(r'/imoveis/([\w-]+)/\d+-\d+$', url)
+                slug_match = _RE_SLUG.search(url)
                 if slug_match:
                     slug = slug_match.group(1)
                     # Remove 'venda-' or 'comprar-' prefix
-                    slug = re.sub(r'^(venda|comprar)-', '', slug)
+                    slug = _RE_BUSINESS_PREFIX.sub('', slug)
                     # Convert hyphens to spaces, capitalize each word
                     title = slug.replace('-', ' ').title()
                     # Make it more readable: "Apartamento T3 Barcelos Martim"
-                    title = re.sub(r'\bT(\d)', r'T\1', title)  # Keep T2, T3 etc uppercase
+                    title = _RE_TYPOLOGY.sub(r'T\1', title)  # Keep T2, T3 etc uppercase
                 else:
                     title = link.get('title', 'Remax Property')
                     if not title or len(title) < 5:
@@ -119,7 +140,7 @@ def parse_remax(html_content):
                         break
                     parent_text = parent.get_text()
                     # Match prices like "240 000 €" or "207.000 €" or "240,000 €"
-                    price_match = re.search(r'([\d]+[\s.\u00a0]?[\d]{3}[\s.\u00a0]?[\d]*)\s*€', parent_text)
+                    price_match = _RE_PRICE_TEXT.search(parent_text)
                     if price_match:
                         price = price_match.group(0).strip()
                         break
@@ -129,14 +150,15 @@ def parse_remax(html_content):
                         break
                     parent = parent.parent
 
-                properties.append({
-                    'id': prop_id,
-                    'title': title,
-                    'url': url,
-                    'price': price,
-                    'site': 'remax'
-                })
-            except Exception:
+                properties.append(Listing(
+                    id=prop_id,
+                    title=title,
+                    url=url,
+                    price=price,
+                    site='remax'
+                ))
+            except Exception as e:
+                logger.debug("Erro ao processar um item da Remax: %s", e)
                 continue
 
     # Strategy 2b: Parse standard card structure
@@ -147,29 +169,30 @@ def parse_remax(html_content):
                 continue
             
             url = link_tag['href']
-            if url and not url.startswith('http'):
-                url = "https://www.remax.pt" + url
+            url = abs_url('remax', url)
             
             title_tag = item.find(['h2', 'h3', 'h4'])
-            title = title_tag.get_text(strip=True) if title_tag else "Remax Property"
+            title = fast_text(title_tag) if title_tag else "Remax Property"
             
-            price_tag = item.find(string=re.compile(r'[\d.,]+\s*€', re.I))
-            price = price_tag.parent.get_text(strip=True) if price_tag and price_tag.parent else "N/A"
+            price_tag = item.find(string=_RE_EURO_AMOUNT)
+            price = fast_text(price_tag.parent) if price_tag and price_tag.parent else "N/A"
             
-            prop_id = re.search(r'/(\d+-\d+)', url)
-            prop_id = prop_id.group(1) if prop_id else hashlib.md5(url.encode()).hexdigest()
+            prop_id = _RE_ID.search(url)
+            prop_id = prop_id.group(1) if prop_id else stable_id(url)
 
-            if any(p['id'] == prop_id for p in properties):
+            if prop_id in seen_ids:
                 continue
+            seen_ids.add(prop_id)
 
-            properties.append({
-                'id': prop_id,
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'remax'
-            })
-        except Exception:
+            properties.append(Listing(
+                id=prop_id,
+                title=title,
+                url=url,
+                price=price,
+                site='remax'
+            ))
+        except Exception as e:
+            logger.debug("Erro ao processar um item da Remax: %s", e)
             continue
             
     return properties
@@ -1,7 +1,33 @@
-from bs4 import BeautifulSoup
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
 import re
-import json
-import hashlib
+from adapters._util import loads_json, fast_text, stable_id, abs_url
+from adapters._types import Listing
+
+logger = logging.getLogger(__name__)
+
+_RE_LISTING = re.compile(r'ListingPreviewItem|PropertyCard|property-card', re.I)
+_RE_LISTING_HREF = re.compile(r'/imovel/|ZMPT', re.I)
+_RE_PROPERTY_HREF = re.compile(r'/pt/imovel/|/imovel/.*ZMPT', re.I)
+_RE_LINK = re.compile(r'text-decoration-none', re.I)
+_RE_TITLE = re.compile(r'title|name|location', re.I)
+_RE_PRICE_CLASS = re.compile(r'price|valor|Price', re.I)
+_RE_EURO = re.compile(r'€')
+_RE_EURO_AMOUNT = re.compile(r'[\d.,]+\s*€', re.I)
+_RE_ZMPT = re.compile(r'(ZMPT\d+)', re.I)
+_RE_ZMPT_EXACT = re.compile(r'(ZMPT\d+)')
+_RE_IMOVEL_ID = re.compile(r'/imovel/[^/]*?(\d{4,})')
+
+def _hashed_id(url):
+    """
+    Last-resort key for a listing URL with no id in it: a hash of the
+    URL. Logged, since it usually means the markup or the URL scheme changed.
+    """
+    logger.warning("Zome: sem ID natural no URL, a usar hash: %s", url)
+    return stable_id(url)
+
+# Strategy 1 only looks inside the listing cards, so build just those first
+_STRAINER = SoupStrainer('div', class_=_RE_LISTING)
 
 def parse_zome(html_content):
     """
@@ -11,81 +37,92 @@ def parse_zome(html_content):
       2. Look for JSON data in script tags (__NEXT_DATA__ or inline state)
       3. Find property links (/pt/imovel/ or ZMPT patterns)
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=_STRAINER)
     properties = []
     seen_ids = set()
+    # A repeated URL always yields the same ID: skip it before deriving one,
+    # so a URL without a natural ID is hashed (and logged) only once
+    seen_urls = set()
     
     # Strategy 1: Find ListingPreviewItem cards (rendered React components)
-    listings = soup.find_all('div', class_=re.compile(r'ListingPreviewItem|PropertyCard|property-card', re.I))
+    listings = soup.find_all('div', class_=_RE_LISTING)
     
     for item in listings:
         try:
             # Link and URL
-            link_tag = item.find('a', href=re.compile(r'/imovel/|ZMPT', re.I))
+            link_tag = item.find('a', href=_RE_LISTING_HREF)
             if not link_tag:
-                link_tag = item.find('a', class_=re.compile(r'text-decoration-none', re.I))
+                link_tag = item.find('a', class_=_RE_LINK)
             if not link_tag:
                 link_tag = item.find('a', href=True)
             if not link_tag:
                 continue
             
             url = link_tag['href']
-            if url and not url.startswith('http'):
-                url = "https://www.zome.pt" + url
+            url = abs_url('zome', url)
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
                 
             # Title
             title_tag = item.find(['h2', 'h3', 'h4'])
             if not title_tag:
-                title_tag = item.find(class_=re.compile(r'title|name|location', re.I))
-            title = title_tag.get_text(strip=True) if title_tag else "Zome Property"
+                title_tag = item.find(class_=_RE_TITLE)
+            title = fast_text(title_tag) if title_tag else "Zome Property"
             
             # Price  
-            price_tag = item.find(class_=re.compile(r'price|valor|Price', re.I))
+            price_tag = item.find(class_=_RE_PRICE_CLASS)
             if not price_tag:
-                price_tag = item.find(string=re.compile(r'[\d.,]+\s*€', re.I))
+                price_tag = item.find(string=_RE_EURO_AMOUNT)
             
             if hasattr(price_tag, 'get_text'):
-                price = price_tag.get_text(strip=True)
+                price = fast_text(price_tag)
             elif price_tag:
                 price = price_tag.strip()
             else:
                 price = "N/A"
             
             # ID: Zome uses ZMPT IDs in URLs
-            id_match = re.search(r'(ZMPT\d+)', url, re.I)
+            id_match = _RE_ZMPT.search(url)
             if id_match:
                 prop_id = id_match.group(1)
             else:
-                id_match = re.search(r'/imovel/[^/]*?(\d{4,})', url)
-                prop_id = id_match.group(1) if id_match else hashlib.md5(url.encode()).hexdigest()
+                id_match = _RE_IMOVEL_ID.search(url)
+                prop_id = id_match.group(1) if id_match else _hashed_id(url)
             
             if prop_id not in seen_ids:
                 seen_ids.add(prop_id)
-                properties.append({
-                    'id': prop_id,
-                    'title': title,
-                    'url': url,
-                    'price': price,
-                    'site': 'zome'
-                })
-        except Exception:
+                properties.append(Listing(
+                    id=prop_id,
+                    title=title,
+                    url=url,
+                    price=price,
+                    site='zome'
+                ))
+        except Exception as e:
+            logger.debug("Erro ao processar um item da Zome: %s", e)
             continue
     
     if properties:
         return properties
     
+    # Strategies 2 and 3 walk links, parents and scripts: parse the whole page
+    soup = BeautifulSoup(html_content, 'lxml')
+
     # Strategy 2: Find all property links in the page
-    property_links = soup.find_all('a', href=re.compile(r'/pt/imovel/|/imovel/.*ZMPT', re.I))
+    property_links = soup.find_all('a', href=_RE_PROPERTY_HREF)
     
     for link in property_links:
         try:
             url = link['href']
-            if not url.startswith('http'):
-                url = "https://www.zome.pt" + url
+            url = abs_url('zome', url)
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
             
             # Extract ZMPT ID
-            id_match = re.search(r'(ZMPT\d+)', url, re.I)
-            prop_id = id_match.group(1) if id_match else hashlib.md5(url.encode()).hexdigest()
+            id_match = _RE_ZMPT.search(url)
+            prop_id = id_match.group(1) if id_match else _hashed_id(url)
             
             if prop_id in seen_ids:
                 continue
@@ -96,30 +133,31 @@ def parse_zome(html_content):
             for _ in range(5):
                 if container is None:
                     break
-                if container.find(string=re.compile(r'€', re.I)):
+                if container.find(string=_RE_EURO):
                     break
                 container = container.parent
             
-            title = link.get_text(strip=True) or link.get('title', 'Zome Property')
+            title = fast_text(link) or link.get('title', 'Zome Property')
             if len(title) < 5:
                 if container:
                     h_tag = container.find(['h2', 'h3', 'h4'])
-                    title = h_tag.get_text(strip=True) if h_tag else 'Zome Property'
+                    title = fast_text(h_tag) if h_tag else 'Zome Property'
             
             price = "N/A"
             if container:
-                price_el = container.find(string=re.compile(r'[\d.,]+\s*€', re.I))
+                price_el = container.find(string=_RE_EURO_AMOUNT)
                 if price_el:
                     price = price_el.strip()
             
-            properties.append({
-                'id': prop_id,
-                'title': title,
-                'url': url,
-                'price': price,
-                'site': 'zome'
-            })
-        except Exception:
+            properties.append(Listing(
+                id=prop_id,
+                title=title,
+                url=url,
+                price=price,
+                site='zome'
+            ))
+        except Exception as e:
+            logger.debug("Erro ao processar um item da Zome: %s", e)
             continue
     
     # Strategy 3: Try JSON extraction from script tags
@@ -127,15 +165,16 @@ def parse_zome(html_content):
         for script in soup.find_all('script'):
             text = script.string or ''
             # Look for listing data in inline scripts
-            zmpt_matches = re.findall(r'(ZMPT\d+)', text)
+            zmpt_matches = _RE_ZMPT_EXACT.findall(text)
             if len(zmpt_matches) > 2:
                 try:
                     # Try to parse as JSON
-                    data = json.loads(text)
+                    data = loads_json(text)
                     # Navigate known structures
                     if isinstance(data, dict):
                         _extract_from_json(data, properties, seen_ids)
-                except Exception:
+                except Exception as e:
+                    logger.debug("Erro ao ler o JSON embutido da Zome: %s", e)
                     pass
     
     return properties
@@ -151,8 +190,7 @@ def _extract_from_json(data, properties, seen_ids, depth=0):
         if 'listingId' in data or 'zmptId' in data or 'ZMPT' in str(data.get('reference', '')):
             prop_id = str(data.get('zmptId', data.get('listingId', data.get('reference', ''))))
             url = data.get('url', data.get('detailUrl', ''))
-            if url and not url.startswith('http'):
-                url = "https://www.zome.pt" + url
+            url = abs_url('zome', url)
             title = data.get('title', data.get('description', 'Zome Property'))
             price = data.get('price', data.get('priceLabel', 'N/A'))
             if isinstance(price, (int, float)):
@@ -160,13 +198,13 @@ def _extract_from_json(data, properties, seen_ids, depth=0):
             
             if prop_id and prop_id not in seen_ids:
                 seen_ids.add(prop_id)
-                properties.append({
-                    'id': prop_id,
-                    'title': str(title)[:100],
-                    'url': url,
-                    'price': str(price),
-                    'site': 'zome'
-                })
+                properties.append(Listing(
+                    id=prop_id,
+                    title=str(title)[:100],
+                    url=url,
+                    price=str(price),
+                    site='zome'
+                ))
             return
         
         for value in data.values():
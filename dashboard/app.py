@@ -1,9 +1,10 @@
 import os
 import asyncio
+import aiofiles
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import create_engine, desc
+from sqlalchemy import create_engine, desc, func
 from sqlalchemy.orm import sessionmaker
 from database import Base, Property, ScrapeLog, RunSummary, get_session
 import json
@@ -11,6 +12,11 @@ import secrets
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
+try:
+    from watchfiles import awatch
+except ImportError: # fall back to polling the log file once a second
+    awatch = None
+
 app = FastAPI()
 
 # Setup paths
@@ -27,11 +33,10 @@ async def get_dashboard(request: Request):
 @app.get("/api/stats")
 async def get_stats():
     with get_session() as session:
-        total = session.query(Property).count()
-        by_site = {}
-        sites = session.query(Property.site).distinct().all()
-        for (site,) in sites:
-            by_site[site] = session.query(Property).filter(Property.site == site).count()
+        # One GROUP BY instead of a COUNT per site; the total is their sum
+        rows = session.query(Property.site, func.count(Property.id)).group_by(Property.site).all()
+        by_site = dict(rows)
+        total = sum(by_site.values())
         
         return {
             "total_properties": total,
@@ -90,30 +95,58 @@ async def get_health():
             "site_health": site_health
         }
 
+def _tail_lines(path, count, chunk_size=64 * 1024):
+    """
+    Returns the last `count` lines of a file. Reads backwards from the end in
+    growing chunks rather than loading the whole (possibly multi-MB) log.
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        while True:
+            start = max(0, size - chunk_size)
+            f.seek(start)
+            lines = f.read().splitlines()
+            # Unless we reached the top, the first line may be cut off: need one spare
+            if start == 0 or len(lines) > count:
+                break
+            chunk_size *= 4
+    return [line.decode("utf-8", errors="replace") for line in lines[-count:]]
+
+async def _send_appended(websocket, f, pending):
+    """
+    Sends the complete lines appended to f since the last read and returns the
+    trailing partial line, to be completed by the next read.
+    """
+    pending += await f.read()
+    *lines, pending = pending.split("\n")
+    for line in lines:
+        await websocket.send_text(line.strip())
+    return pending
+
 @app.websocket("/ws/logs")
 async def websocket_logs(websocket: WebSocket):
     await websocket.accept()
     try:
         # Initial tail of the last few lines
         if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, "r") as f:
-                lines = f.readlines()[-50:]
-                for line in lines:
-                    await websocket.send_text(line.strip())
+            for line in await asyncio.to_thread(_tail_lines, LOG_FILE, 50):
+                await websocket.send_text(line.strip())
         
-        # Stream new lines
-        while True:
-            if os.path.exists(LOG_FILE):
-                with open(LOG_FILE, "r") as f:
-                    f.seek(0, os.SEEK_END)
-                    while True:
-                        line = f.readline()
-                        if not line:
-                            await asyncio.sleep(1)
-                            continue
-                        await websocket.send_text(line.strip())
+        # Stream new lines through a single handle kept open for the session;
+        # aiofiles keeps a slow disk from stalling the API handlers
+        while not os.path.exists(LOG_FILE):
+            await asyncio.sleep(2)
+        async with aiofiles.open(LOG_FILE, "r") as f:
+            await f.seek(0, os.SEEK_END)
+            pending = ""
+            if awatch is not None:
+                # Woken by the OS when the file changes instead of polling it
+                async for _ in awatch(LOG_FILE):
+                    pending = await _send_appended(websocket, f, pending)
             else:
-                await asyncio.sleep(2)
+                while True:
+                    pending = await _send_appended(websocket, f, pending)
+                    await asyncio.sleep(1)
     except WebSocketDisconnect:
         pass
 
@@ -1,5 +1,7 @@
 import asyncio
 import sys
+from functools import lru_cache
+from urllib.parse import urlparse
 from playwright.async_api import async_playwright
 from adapters.factorvalor import parse_factorvalor
 from adapters.idealista import parse_idealista
@@ -11,9 +13,13 @@ PARSERS = {
     "idealista.pt": parse_idealista,
 }
 
+PARSER_DOMAINS = tuple(PARSERS.items())
+
+@lru_cache(maxsize=256)
 def get_parser(url):
-    for domain, parser in PARSERS.items():
-        if domain in url:
+    host = urlparse(url).hostname or ''
+    for domain, parser in PARSER_DOMAINS:
+        if host == domain or host.endswith('.' + domain):
             return parser
     return parse_generic_logic
 
@@ -40,7 +46,7 @@ async def debug_url(url):
             
             print(f"\nFound {len(results)} properties:")
             for i, prop in enumerate(results):
-                print(f"{i+1}. {prop['title']} - {prop['price']} ({prop['url']})")
+                print(f"{i+1}. {prop.title} - {prop.price} ({prop.url})")
                 
             if len(results) == 0:
                 print("\nWARNING: No results found. Dumping HTML to debug_output.html")
@@ -14,18 +14,25 @@ Architecture:
 
 import os
 import asyncio
+import gzip
 import time
-import requests
+import aiohttp
 import html
-import logging
-import random
 import re
+import logging
 import uuid
+from functools import lru_cache
+from urllib.parse import urlsplit
 from playwright.async_api import async_playwright
 from dotenv import load_dotenv
 
+try:
+    from watchfiles import awatch
+except ImportError: # fall back to checking for the trigger file every few seconds
+    awatch = None
+
 # Import local modules for database and specialized site adapters
-from database import init_db, is_property_new, save_property, save_scrape_log, save_run_summary
+from database import init_db, get_scoped_session, load_property_ids, save_properties_bulk, save_scrape_log, save_run_summary
 from adapters.imovirtual import parse_imovirtual
 from adapters.idealista import parse_idealista
 from adapters.olx import parse_olx
@@ -51,12 +58,34 @@ BROWSER_WS_ENDPOINT = os.getenv("BROWSER_WS_ENDPOINT")
 SCRAPE_INTERVAL = int(os.getenv("SCRAPE_INTERVAL", "3600"))
 CONCURRENCY_LIMIT = int(os.getenv("CONCURRENCY_LIMIT", "2"))
 MIN_PRICE = int(os.getenv("MIN_PRICE", "100000"))
+DEBUG_DUMP_HTML = os.getenv("DEBUG_DUMP_HTML", "0") == "1"
+DEBUG_DUMP_INTERVAL = 3600  # at most one dump per domain per hour
+# Stat-poll the trigger directory instead of using inotify (Docker Desktop, NFS mounts)
+TRIGGER_FORCE_POLLING = os.getenv("TRIGGER_FORCE_POLLING", "0") == "1"
 LINKS_FILE = "links"
 
+# Every ASCII byte except 0-9, for deleting with bytes.translate
+_NON_DIGIT_BYTES = bytes(b for b in range(128) if not 48 <= b <= 57)
+
+# Markers of a bot wall; matched case-insensitively in a single pass over the page
+_BLOCK_RE = re.compile(r'captcha|acesso negado|access denied', re.I)
+
+# IDs known to be in the database, loaded at startup and grown as listings are saved
+_seen_ids = set()
+
+# Last time (epoch seconds) the HTML of each domain was dumped for debugging
+_last_dump = {}
+
+# Substrings of an error message that mean the browser connection is gone
+_CONN_KEYWORDS = ("closed", "connection", "reset", "disconnected", "target")
+
 # File paths
 LOG_FILE = "scraper.log"
 TRIGGER_FILE = "trigger.flag"
 
+# Set when the dashboard drops TRIGGER_FILE; wakes the idle wait between cycles
+TRIGGER_EVENT = asyncio.Event()
+
 # Logging setup
 logging.basicConfig(
     level=logging.INFO,
@@ -85,11 +114,32 @@ PARSERS = {
     "h-urb.com": parse_hurb,
     "lardesonho.pt": parse_lardesonho,
 }
+# Longest domain first, so the most specific suffix wins
+PARSER_DOMAINS = tuple(sorted(PARSERS.items(), key=lambda item: len(item[0]), reverse=True))
+
+# Sites whose listing cards are all in the server-rendered HTML. Their pages are
+# parsed from the navigation response body, skipping the cookie banner, the
+# selector wait, the scroll and the DOM serialization of page.content().
+SERVER_RENDERED_SITES = (
+    "olx.pt",
+    "idealista.pt",
+    "casa.sapo.pt",
+    "imovirtual.com",
+)
 
 # Site-specific CSS selectors to wait for before extracting content.
 # These sites use dynamic JS rendering (SPA/React/Next.js) and need
-# the browser to wait until these elements appear in the DOM.
+# the browser to wait until these elements appear in the DOM. Sites listed
+# here are loaded only up to DOMContentLoaded; the selector wait replaces
+# waiting for every ad and tracker to finish loading.
 SITE_WAIT_SELECTORS = {
+    "imovirtual.com": "article[data-sentry-component='AdvertCard'], article[data-testid='listing-ad'], article[data-testid='listing-item']",
+    "idealista.pt": "article.item",
+    "olx.pt": "div[data-testid='l-card']",
+    "custojusto.pt": "a[class*='itemCard_link']",
+    "casa.sapo.pt": "div[class*='searchItem']",
+    "franciscofaria.pt": "div.item-listing-wrap",
+    "decisoesesolucoes.com": "div.property-card",
     "factorvalor.pt": ".propertyItem, .propertyItemWrap",
     "h-urb.com": ".propertyItem, .propertyItemWrap",
     "zome.pt": "a[href*='/imovel/'], .ListingPreviewItem, [class*='ListingPreview']",
@@ -100,39 +150,46 @@ SITE_WAIT_SELECTORS = {
     "lardesonho.pt": "a[href*='/imovel/'], .destaque-box-wrapper, .overlay-price-wrapper",
 }
 
-def send_telegram_message_sync(message):
+# Shared aiohttp session for the Telegram Bot API; opened and closed by run_scraper
+TELEGRAM_SESSION = None
+_TG_URL = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage" if TELEGRAM_TOKEN else None
+_TG_TIMEOUT = aiohttp.ClientTimeout(total=10)
+_TG_SEM = asyncio.Semaphore(1)
+
+async def send_telegram_message(message):
     if not TELEGRAM_TOKEN or not CHAT_ID:
         logger.warning("Telegram credentials missing, skipping notification.")
         return
+    if TELEGRAM_SESSION is None or TELEGRAM_SESSION.closed:
+        logger.warning("Telegram session not open, skipping notification.")
+        return
 
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    
     chat_ids = [cid.strip() for cid in CHAT_ID.split(',') if cid.strip()]
-    for cid in chat_ids:
-        payload = {
-            "chat_id": cid,
-            "text": message,
-            "parse_mode": "HTML"
-        }
+    # One message at a time across all workers, so the 1s pacing below keeps
+    # the whole scraper inside the Bot API rate limit and messages stay in order
+    async with _TG_SEM:
+        for cid in chat_ids:
+            payload = {
+                "chat_id": cid,
+                "text": message,
+                "parse_mode": "HTML"
+            }
         
-        for attempt in range(3):
-            try:
-                response = requests.post(url, json=payload, timeout=10)
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 5))
-                    logger.info(f"Telegram Rate Limit (429). Sleeping for {retry_after}s...")
-                    time.sleep(retry_after)
-                    continue
-                    
-                response.raise_for_status()
-                time.sleep(1.0) 
-                break
-            except Exception as e:
-                logger.error(f"Failed to send Telegram message to {cid} (attempt {attempt+1}): {e}")
-                time.sleep(2)
-
-async def send_telegram_message(message):
-    return await asyncio.to_thread(send_telegram_message_sync, message)
+            for attempt in range(3):
+                try:
+                    async with TELEGRAM_SESSION.post(_TG_URL, json=payload, timeout=_TG_TIMEOUT) as response:
+                        if response.status == 429:
+                            retry_after = int(response.headers.get("Retry-After", 5))
+                            logger.info(f"Telegram Rate Limit (429). Sleeping for {retry_after}s...")
+                            await asyncio.sleep(retry_after)
+                            continue
+                        
+                        response.raise_for_status()
+                    await asyncio.sleep(1.0) 
+                    break
+                except Exception as e:
+                    logger.error(f"Failed to send Telegram message to {cid} (attempt {attempt+1}): {e}")
+                    await asyncio.sleep(2)
 
 async def wait_for_db():
     logger.info("Aguardando base de dados ficar pronta...")
@@ -146,26 +203,136 @@ async def wait_for_db():
             await asyncio.sleep(5)
     return False
 
+def _host_matches(host, domain):
+    return host == domain or host.endswith('.' + domain)
+
+@lru_cache(maxsize=256)
+def get_wait_selector(url):
+    """
+    Returns (domain, selector) from SITE_WAIT_SELECTORS for this URL, or (None, None).
+    """
+    host = urlsplit(url).hostname or ''
+    for domain, selector in SITE_WAIT_SELECTORS.items():
+        if _host_matches(host, domain):
+            return domain, selector
+    return None, None
+
+@lru_cache(maxsize=256)
+def is_server_rendered(url):
+    host = urlsplit(url).hostname or ''
+    return any(_host_matches(host, domain) for domain in SERVER_RENDERED_SITES)
+
+@lru_cache(maxsize=256)
 def get_parser(url):
-    url_lower = url.lower()
-    for domain, parser_func in PARSERS.items():
-        if domain in url_lower:
+    # The links file is static, so each URL is resolved once per process
+    host = urlsplit(url).hostname or ''
+    parser_func = PARSERS.get(host.removeprefix('www.'))
+    if parser_func:
+        return parser_func
+    for domain, parser_func in PARSER_DOMAINS:
+        if _host_matches(host, domain):
             return parser_func
     return None
 
+def _parse_page(url, html_content):
+    parser_func = get_parser(url)
+    if parser_func:
+        return parser_func(html_content)
+    return parse_generic_logic(html_content, url)
+
+def _dump_html(filename, content):
+    with gzip.open(filename, "wt", encoding="utf-8") as f:
+        f.write(content)
+
 def clean_price_value(price_str):
     if not price_str or "consulta" in price_str.lower():
         return 0
-    numeric_str = "".join(re.findall(r'\d+', price_str))
-    try:
-        return int(numeric_str) if numeric_str else 0
-    except ValueError:
-        return 0
+    # Drop non-ASCII ('€', narrow no-break spaces) then every non-digit, in C
+    digits = price_str.encode('ascii', 'ignore').translate(None, _NON_DIGIT_BYTES)
+    return int(digits) if digits else 0
+
+def _parse_and_filter(url, html_content, min_price):
+    """
+    Parses one page and returns (all listings, listings priced at min_price or more).
+    """
+    found = _parse_page(url, html_content)
+    valid = [prop for prop in found if clean_price_value(prop.price) >= min_price]
+    return found, valid
+
+# Options for the browser context shared by every scrape
+CONTEXT_OPTIONS = {
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "viewport": {'width': 1920, 'height': 1080},
+    "locale": "pt-PT",
+    "timezone_id": "Europe/Lisbon",
+    "extra_http_headers": {
+        "Accept-Language": "pt-PT,pt;q=0.9,en-US;q=0.8,en;q=0.7",
+        "Upgrade-Insecure-Requests": "1"
+    }
+}
+
+# The parsers only read the HTML, so nothing that just gets painted is downloaded
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+BLOCKED_HOSTS = frozenset({'googletagmanager.com', 'google-analytics.com', 'doubleclick.net', 'facebook.net'})
+
+def _is_blocked_host(url):
+    host = urlsplit(url).hostname or ''
+    if host in BLOCKED_HOSTS:
+        return True
+    # Subdomains (www., stats.g., connect.) match their registered domain
+    parts = host.split('.')
+    return any('.'.join(parts[i:]) in BLOCKED_HOSTS for i in range(1, len(parts) - 1))
+
+async def _block_heavy(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or _is_blocked_host(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+# Keeps scrolling to the bottom while the page grows, up to SCROLL_MAX_STEPS steps
+# of SCROLL_STEP_MS. Runs in the page, so the whole auto-scroll is a single
+# round-trip; the limits are passed as an argument so the source never changes.
+SCROLL_MAX_STEPS = 8
+SCROLL_STEP_MS = 400
+SCROLL_JS = """async ([maxSteps, stepMs]) => {
+    let last = 0;
+    for (let i = 0; i < maxSteps; i++) {
+        window.scrollTo(0, document.body.scrollHeight);
+        await new Promise(r => setTimeout(r, stepMs));
+        if (document.body.scrollHeight === last) break;
+        last = document.body.scrollHeight;
+    }
+}"""
+
+# Appends the intercepted Remax API payload to the DOM for parse_remax
+INJECT_API_DATA_JS = """(jsonStr) => {
+    const script = document.createElement('script');
+    script.id = '__REMAX_API_DATA__';
+    script.type = 'application/json';
+    script.textContent = jsonStr;
+    document.body.appendChild(script);
+}"""
+
+# Contexts are recycled after this many pages; long-lived ones slowly leak memory
+CONTEXT_MAX_PAGES = 50
+
+class _PooledContext:
+    """A pool slot: its context (created lazily) and how many pages it has served."""
+    __slots__ = ('context', 'pages')
 
-class BrowserManager:
     def __init__(self):
+        self.context = None
+        self.pages = 0
+
+class BrowserManager:
+    def __init__(self, pool_size=CONCURRENCY_LIMIT):
         self._playwright = None
         self._browser = None
+        self._slots = [_PooledContext() for _ in range(pool_size)]
+        self._idle = asyncio.Queue()
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
         self._lock = asyncio.Lock()
     
     async def start(self):
@@ -179,7 +346,6 @@ class BrowserManager:
                     if BROWSER_WS_ENDPOINT:
                         logger.info(f"Conectando ao browser em {BROWSER_WS_ENDPOINT}...")
                         # Try Browserless v2 connect() first, then v1 connect_over_cdp()
-                        import asyncio
                         for attempt in range(5):
                             try:
                                 self._browser = await self._playwright.chromium.connect(BROWSER_WS_ENDPOINT)
@@ -202,9 +368,46 @@ class BrowserManager:
             await self.start()
         return self._browser
 
+    async def acquire_context(self):
+        """
+        Takes a context slot from the pool (one per worker), opening a fresh
+        context when the slot is empty, was opened on a browser that has since
+        been replaced, or has served CONTEXT_MAX_PAGES pages.
+        Hand it back with release_context().
+        """
+        slot = await self._idle.get()
+        try:
+            browser = await self.get_browser()
+            if slot.context is None or slot.context.browser is not browser or slot.pages >= CONTEXT_MAX_PAGES:
+                await self._close_slot(slot)
+                slot.context = await browser.new_context(**CONTEXT_OPTIONS)
+                await slot.context.route('**/*', _block_heavy)
+            slot.pages += 1
+            return slot
+        except:
+            self._idle.put_nowait(slot)
+            raise
+
+    def release_context(self, slot):
+        self._idle.put_nowait(slot)
+
+    async def _close_slot(self, slot):
+        if slot.context:
+            try:
+                await slot.context.close()
+            except:
+                pass
+        slot.context = None
+        slot.pages = 0
+
+    async def _close_contexts(self):
+        for slot in self._slots:
+            await self._close_slot(slot)
+
     async def restart(self):
         logger.warning("Reiniciando BrowserManager...")
         async with self._lock:
+            await self._close_contexts()
             if self._browser:
                 try:
                     await self._browser.close()
@@ -214,6 +417,7 @@ class BrowserManager:
         await self.start()
 
     async def stop(self):
+        await self._close_contexts()
         if self._browser:
             await self._browser.close()
         if self._playwright:
@@ -268,29 +472,25 @@ async def _dismiss_cookie_consent(page):
     return False
 
 async def scrape_site(browser_manager, search_url, counter_text, run_id=""):
+    # One session for all of this site's database work instead of one per call
+    db_session = get_scoped_session()
+    try:
+        return await _scrape_site(browser_manager, search_url, counter_text, run_id, db_session)
+    finally:
+        await asyncio.to_thread(db_session.close)
+
+async def _scrape_site(browser_manager, search_url, counter_text, run_id, db_session):
     max_retries = 3
     site_start = time.time()
     cookie_was_dismissed = False
     
     for attempt in range(max_retries):
-        context = None
+        slot = None
         page = None
         try:
-            browser = await browser_manager.get_browser()
-            
-            # Context creation
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-                viewport={'width': 1920, 'height': 1080},
-                locale="pt-PT",
-                timezone_id="Europe/Lisbon",
-                extra_http_headers={
-                    "Accept-Language": "pt-PT,pt;q=0.9,en-US;q=0.8,en;q=0.7",
-                    "Upgrade-Insecure-Requests": "1"
-                }
-            )
-            
-            page = await context.new_page()
+            # Pooled context, kept warm across sites; each scrape gets its own page
+            slot = await browser_manager.acquire_context()
+            page = await slot.context.new_page()
 
             # Network interception for sites with hidden APIs (like Remax)
             api_data = {}
@@ -307,60 +507,59 @@ async def scrape_site(browser_manager, search_url, counter_text, run_id=""):
             attempt_str = f" (Tentativa {attempt+1}/{max_retries})" if attempt > 0 else ""
             logger.info(f"{counter_text}{attempt_str} Verificando: {search_url}")
             
+            # With a listing selector to wait for, don't also wait for the load event
+            wait_domain, wait_selector = get_wait_selector(search_url)
+            wait_until = "domcontentloaded" if wait_selector else "load"
             try:
-                await page.goto(search_url, wait_until="load", timeout=90000)
+                response = await page.goto(search_url, wait_until=wait_until, timeout=90000)
             except Exception as e:
                 if "Target page, context or browser has been closed" in str(e):
                     raise Exception("Browser disconnected during navigation")
                 raise e
 
-            # Dismiss cookie consent banners (common on Portuguese sites)
-            cookie_was_dismissed = await _dismiss_cookie_consent(page)
+            # Server-rendered sites already have every card in the document the
+            # server sent: read it as received instead of serializing the live DOM
+            content = None
+            if response is not None and response.ok and is_server_rendered(search_url):
+                try:
+                    content = await response.text()
+                except Exception:
+                    content = None
+
+            if content is None:
+                # Dismiss cookie consent banners (common on Portuguese sites)
+                cookie_was_dismissed = await _dismiss_cookie_consent(page)
 
-            # Site-specific wait for dynamic/SPA content
-            for domain, selector in SITE_WAIT_SELECTORS.items():
-                if domain in search_url:
+                # Site-specific wait for dynamic/SPA content
+                if wait_selector:
                     try:
-                        logger.info(f"Aguardando carregamento dinâmico ({domain})...")
-                        await page.wait_for_selector(selector, timeout=30000)
-                        logger.info(f"Elementos encontrados para {domain}")
+                        logger.info(f"Aguardando carregamento dinâmico ({wait_domain})...")
+                        await page.wait_for_selector(wait_selector, timeout=30000)
+                        logger.info(f"Elementos encontrados para {wait_domain}")
                     except:
-                        logger.warning(f"Timeout ao aguardar elementos ({domain}): {search_url}")
-                    break
+                        logger.warning(f"Timeout ao aguardar elementos ({wait_domain}): {search_url}")
 
-            await asyncio.sleep(2)
-            
-            # Auto-scroll to trigger lazy loading
-            for i in range(3):
+                # Scroll to the bottom until the page stops growing (lazy loaders),
+                # then wait for the network to settle instead of sleeping a fixed amount
                 try:
-                    await page.evaluate(f"window.scrollTo(0, document.body.scrollHeight * {i+1} / 3)")
+                    await page.evaluate(SCROLL_JS, [SCROLL_MAX_STEPS, SCROLL_STEP_MS])
                 except:
                     pass
-                await asyncio.sleep(1)
-            
-            # Scroll back to top and wait a bit more for any final renders
-            try:
-                await page.evaluate("window.scrollTo(0, 0)")
-            except:
-                pass
-            await asyncio.sleep(1)
-
-            # Inject intercepted API data into DOM if available
-            if 'json' in api_data:
-                logger.info("Injecting intercepted API data into DOM...")
                 try:
-                    json_str = api_data['json']
-                    await page.evaluate("""(jsonStr) => {
-                        const script = document.createElement('script');
-                        script.id = '__REMAX_API_DATA__';
-                        script.type = 'application/json';
-                        script.textContent = jsonStr;
-                        document.body.appendChild(script);
-                    }""", json_str)
-                except Exception as e:
-                    logger.error(f"Failed to inject API data: {e}")
+                    await page.wait_for_load_state("networkidle", timeout=5000)
+                except:
+                    pass
+
+                # Inject intercepted API data into DOM if available
+                if 'json' in api_data:
+                    logger.info("Injecting intercepted API data into DOM...")
+                    try:
+                        await page.evaluate(INJECT_API_DATA_JS, api_data['json'])
+                    except Exception as e:
+                        logger.error(f"Failed to inject API data: {e}")
+
+                content = await page.content()
 
-            content = await page.content()
             html_size = len(content)
             
             parser_func = get_parser(search_url)
@@ -368,80 +567,99 @@ async def scrape_site(browser_manager, search_url, counter_text, run_id=""):
             
             logger.info(f"[{parser_name}] HTML Len: {html_size}")
 
-            if parser_func:
-                found_properties = parser_func(content)
-            else:
-                found_properties = parse_generic_logic(content, search_url)
+            # Parsing and the price filter are CPU-bound; run both in one hop off
+            # the event loop so the other workers' page loads keep progressing
+            found_properties, valid_properties = await asyncio.to_thread(
+                _parse_and_filter, search_url, content, MIN_PRICE
+            )
 
             # Determine site name for logging
             site_domain = search_url.split('/')[2].replace('www.', '')
 
             # Check for generic "blocked" signals if 0 results
             if len(found_properties) == 0:
-                if "captcha" in content.lower() or "acesso negado" in content.lower() or "access denied" in content.lower():
+                if _BLOCK_RE.search(content):
                      logger.warning(f"BLOCKED: {search_url}")
                      duration = int(time.time() - site_start)
                      await asyncio.to_thread(
                          save_scrape_log, run_id, search_url, site_domain,
                          'blocked', 0, 0, 0, 'Blocked/Captcha', html_size,
-                         parser_name, duration, cookie_was_dismissed
+                         parser_name, duration, cookie_was_dismissed, db_session
                      )
                      return {"url": search_url, "status": "❌", "found": 0, "new": 0, "error": "Blocked/Captcha"}
 
-            valid_properties = []
-            for prop in found_properties:
-                price_val = clean_price_value(prop['price'])
-                if price_val >= MIN_PRICE:
-                    valid_properties.append(prop)
-
             if not found_properties:
                 logger.warning(f"[AVISO] {search_url} | {parser_name} | 0 encontros")
-                # Debug: Dump HTML for investigation
+                # Debug: Dump HTML for investigation (opt-in, rate-limited per domain)
                 domain = search_url.split('/')[2]
-                filename = f"debug_{domain}.html"
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write(content)
-                logger.info(f"HTML of {domain} dumped to {filename}")
+                now = time.time()
+                if DEBUG_DUMP_HTML and now - _last_dump.get(domain, 0) > DEBUG_DUMP_INTERVAL:
+                    _last_dump[domain] = now
+                    filename = f"debug_{domain}.html.gz"
+                    await asyncio.to_thread(_dump_html, filename, content)
+                    logger.info(f"HTML of {domain} dumped to {filename}")
             else:
                 logger.info(f"[SUCESSO] {search_url} | {parser_name} | Total: {len(found_properties)} | Válidos: {len(valid_properties)}")
 
-            new_count_site = 0
-            for prop in valid_properties:
+            # Only the counts are needed from here on; let the page HTML and the
+            # full listing list go before the DB and Telegram awaits
+            found_count = len(found_properties)
+            del content, found_properties
+
+            # Listings already stored are skipped in memory; the rest go in one
+            # INSERT ... ON CONFLICT DO NOTHING, and only the IDs it actually
+            # inserted are announced
+            # A listing without an ID would fail the whole multi-row INSERT
+            missing_id = [prop for prop in valid_properties if not prop.id]
+            if missing_id:
+                logger.warning(f"{len(missing_id)} anúncio(s) sem ID ignorado(s) em {search_url}")
+                valid_properties = [prop for prop in valid_properties if prop.id]
+            unseen = [prop for prop in valid_properties if prop.id not in _seen_ids]
+            new_ids = set()
+            if unseen:
                 try:
-                    is_new = await asyncio.to_thread(is_property_new, prop['id'])
-                    if is_new:
-                        logger.info(f"NOVA PROPRIEDADE: {prop['title']} - {prop['price']}")
-                        await asyncio.to_thread(
-                            save_property, prop['id'], prop['site'], prop['title'], prop['url'], prop['price']
-                        )
-                        
-                        msg = (
-                            "🏠 <b>Nova Casa Encontrada!</b>\n\n"
-                            f"<b>Título:</b> {html.escape(prop['title'])}\n"
-                            f"<b>Preço:</b> {html.escape(prop['price'])}\n"
-                            f"<b>Site:</b> {prop['site']}\n\n"
-                            f"<a href='{html.escape(prop['url'])}'>Ver no site</a>"
-                        )
-                        await send_telegram_message(msg)
-                        new_count_site += 1
+                    new_ids = await asyncio.to_thread(save_properties_bulk, unseen, db_session)
+                    _seen_ids.update(prop.id for prop in unseen)
                 except Exception as e_db:
-                    logger.error(f"Erro DB/Telegram: {e_db}")
+                    logger.error(f"Erro DB: {e_db}")
+
+            messages = []
+            for prop in valid_properties:
+                if prop.id not in new_ids:
+                    continue
+                new_ids.discard(prop.id)
+                logger.info(f"NOVA PROPRIEDADE: {prop.title} - {prop.price}")
+                messages.append(
+                    "🏠 <b>Nova Casa Encontrada!</b>\n\n"
+                    f"<b>Título:</b> {html.escape(prop.title)}\n"
+                    f"<b>Preço:</b> {html.escape(prop.price)}\n"
+                    f"<b>Site:</b> {prop.site}\n\n"
+                    f"<a href='{html.escape(prop.url)}'>Ver no site</a>"
+                )
+            new_count_site = len(messages)
+
+            # Queued together; the Telegram semaphore still sends them in order
+            sent = await asyncio.gather(*(send_telegram_message(m) for m in messages), return_exceptions=True)
+            for result in sent:
+                if isinstance(result, Exception):
+                    logger.error(f"Erro Telegram: {result}")
             
             # Save scrape log to DB
             duration = int(time.time() - site_start)
-            log_status = 'success' if found_properties else 'empty'
+            log_status = 'success' if found_count else 'empty'
             await asyncio.to_thread(
                 save_scrape_log, run_id, search_url, site_domain,
-                log_status, len(found_properties), len(valid_properties),
+                log_status, found_count, len(valid_properties),
                 new_count_site, None, html_size, parser_name, duration,
-                cookie_was_dismissed
+                cookie_was_dismissed, db_session
             )
             
-            return {"url": search_url, "status": "✅", "found": len(found_properties), "new": new_count_site}
+            return {"url": search_url, "status": "✅", "found": found_count, "new": new_count_site}
 
         except Exception as e:
             error_msg = str(e)
-            is_connection_error = any(x in error_msg.lower() for x in ["closed", "connection", "reset", "disconnected", "target"])
+            err_low = error_msg.lower()
+            is_connection_error = any(k in err_low for k in _CONN_KEYWORDS)
             
             if is_connection_error:
                 logger.warning(f"[CRITICAL] Browser Error: {error_msg}. Restarting manager...")
@@ -461,15 +679,17 @@ async def scrape_site(browser_manager, search_url, counter_text, run_id=""):
             await asyncio.to_thread(
                 save_scrape_log, run_id, search_url, site_domain,
                 'error', 0, 0, 0, error_msg[:200], 0,
-                None, duration, False
+                None, duration, False, db_session
             )
             
             return {"url": search_url, "status": "❌", "found": 0, "new": 0, "error": error_msg[:50]}
             
         finally:
-            if context:
-                try: await context.close()
+            if page:
+                try: await page.close()
                 except: pass
+            if slot:
+                browser_manager.release_context(slot)
 
 async def worker(name, queue, browser_manager, results, run_id):
     logger.info(f"Worker {name} started.")
@@ -491,7 +711,32 @@ async def worker(name, queue, browser_manager, results, run_id):
         finally:
             queue.task_done()
 
+# (mtime, links) of the last read of LINKS_FILE
+_links_cache = {}
+
+def load_links():
+    """
+    Returns the URLs in LINKS_FILE, skipping blanks and comments and dropping
+    duplicates (first occurrence wins). Only re-read when the file changes.
+    """
+    mtime = os.path.getmtime(LINKS_FILE)
+    cached = _links_cache.get(LINKS_FILE)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(LINKS_FILE, 'r') as f:
+        lines = (line.strip() for line in f.read().splitlines())
+        links = tuple(dict.fromkeys(line for line in lines if line and not line.startswith('#')))
+    _links_cache[LINKS_FILE] = (mtime, links)
+    return links
+
+def _fmt_result(r):
+    """One line of the end-of-cycle report for a scrape_site result."""
+    if r['status'] == "✅":
+        return f"{r['status']} {r['url']} - Encontrados: {r['found']} (Novos: {r['new']})"
+    return f"{r['status']} {r['url']} - Erro: {r.get('error')}"
+
 async def run_scraper():
+    global TELEGRAM_SESSION
     run_id = str(uuid.uuid4())[:8]  # Short unique ID for this run
     run_start = time.time()
     logger.info(f"Iniciando nova pesquisa [run={run_id}]...")
@@ -500,8 +745,7 @@ async def run_scraper():
         logger.error(f"Arquivo '{LINKS_FILE}' não encontrado.")
         return
 
-    with open(LINKS_FILE, 'r') as f:
-        links = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+    links = load_links()
 
     if not links:
         logger.warning("Nenhum link encontrado.")
@@ -509,6 +753,8 @@ async def run_scraper():
 
     browser_manager = BrowserManager()
     await browser_manager.start()
+    # Keep-alive connections to api.telegram.org, reused by every notification
+    TELEGRAM_SESSION = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=4))
     
     try:
         queue = asyncio.Queue()
@@ -536,10 +782,7 @@ async def run_scraper():
         logger.info(f"RELATÓRIO [run={run_id}]:")
         
         for r in results:
-            if r['status'] == "✅":
-                logger.info(f"{r['status']} {r['url']} - Encontrados: {r['found']} (Novos: {r['new']})")
-            else:
-                logger.info(f"{r['status']} {r['url']} - Erro: {r.get('error')}")
+            logger.info(_fmt_result(r))
         
         logger.info("="*50)
         
@@ -556,18 +799,68 @@ async def run_scraper():
                     f"Encontrados: {total_found} | Novos: {total_new_found}")
 
     finally:
+        await TELEGRAM_SESSION.close()
         await browser_manager.stop()
 
+def _is_trigger_file(change, path):
+    return os.path.basename(path) == TRIGGER_FILE
+
+async def _poll_trigger():
+    while True:
+        await asyncio.sleep(5)
+        if os.path.exists(TRIGGER_FILE):
+            TRIGGER_EVENT.set()
+
+async def watch_trigger():
+    """
+    Sets TRIGGER_EVENT whenever TRIGGER_FILE shows up, so a manual trigger
+    starts the next cycle straight away. A check every 5s runs alongside the
+    watcher, so triggers are still picked up on mounts where file events never
+    arrive, when watchfiles is missing or when the watcher fails.
+    """
+    if awatch is None:
+        await _poll_trigger()
+        return
+
+    poll_task = asyncio.create_task(_poll_trigger())
+    watch_dir = os.path.dirname(os.path.abspath(TRIGGER_FILE))
+    try:
+        # Not recursive: the log and the rest of the tree live under the same dir
+        async for _ in awatch(watch_dir, watch_filter=_is_trigger_file, recursive=False,
+                              force_polling=TRIGGER_FORCE_POLLING):
+            if os.path.exists(TRIGGER_FILE):
+                TRIGGER_EVENT.set()
+    except Exception as e:
+        logger.error(f"Falha ao vigiar {TRIGGER_FILE}, a verificar a cada 5s: {e}")
+    await poll_task
+
 async def async_main():
     if not await wait_for_db():
         logger.critical("Não foi possível ligar à base de dados. Encerrando.")
         return
 
+    try:
+        _seen_ids.update(await asyncio.to_thread(load_property_ids))
+        logger.info(f"{len(_seen_ids)} propriedades já conhecidas carregadas.")
+    except Exception as e:
+        logger.error(f"Erro ao carregar propriedades conhecidas: {e}")
+
+    # A trigger left over from before the restart counts once, for the first cycle
+    if os.path.exists(TRIGGER_FILE):
+        TRIGGER_EVENT.set()
+
+    # Keep a reference so the watcher task is not garbage-collected
+    trigger_task = asyncio.create_task(watch_trigger())
+
     while True:
         # Check for manual trigger
-        if os.path.exists(TRIGGER_FILE):
+        if TRIGGER_EVENT.is_set():
             logger.info("Trigger manual detectado!")
-            os.remove(TRIGGER_FILE)
+            TRIGGER_EVENT.clear()
+            try:
+                os.remove(TRIGGER_FILE)
+            except FileNotFoundError:
+                pass
 
         try:
             await run_scraper()
@@ -576,12 +869,10 @@ async def async_main():
             
         logger.info(f"Próxima verificação em {SCRAPE_INTERVAL} segundos...")
         
-        wait_time = SCRAPE_INTERVAL
-        while wait_time > 0:
-            if os.path.exists(TRIGGER_FILE):
-                break
-            await asyncio.sleep(5)
-            wait_time -= 5
+        try:
+            await asyncio.wait_for(TRIGGER_EVENT.wait(), timeout=SCRAPE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
 
 if __name__ == "__main__":
     asyncio.run(async_main())
@@ -0,0 +1,88 @@
+"""
+The raw-HTML fast paths of the OLX, Idealista and Casa SAPO adapters must
+return exactly what their DOM parsers return, including on cards that carry
+comments and inline scripts with markup that looks like card fields.
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adapters import casasapo, idealista, olx
+
+OLX_HTML = """<html><body>
+<div data-testid="l-card" id="1">
+  <!-- <a href="/d/commented.html"><h6>Commented</h6></a> -->
+  <a href="/d/anuncio/casa-ID1.html"><h6>Moradia <b>T3</b></h6></a>
+  <script>document.write('<p data-testid="ad-price">bogus</p></div>');</script>
+  <p data-testid="ad-price">100 €<!-- old: 90 € --></p>
+</div>
+<div data-testid="l-card" id="2">
+  <style>.x:after { content: '<h6>bogus</h6>'; }</style>
+  <a href="https://www.olx.pt/d/anuncio/apt-ID2.html"><h6>Apartamento T2</h6></a>
+  <!-- <p data-testid="ad-price">bogus</p> -->
+  <p data-testid="ad-price">180 000 €</p>
+</div>
+</body></html>"""
+
+IDEALISTA_HTML = """<html><body><main>
+<article class="item" data-element-id="33001">
+  <!-- <a href="/imovel/99999/" class="item-link" title="bogus">bogus</a> -->
+  <a href="/imovel/33001/" class="item-link" title="Apartamento T2">Apartamento T2</a>
+  <script>var card = '<span class="item-price">bogus</span></article>';</script>
+  <span class="item-price">230.000<span>€</span></span>
+</article>
+<!-- <article class="item" data-element-id="bogus"><a href="/imovel/1/" class="item-link">x</a></article> -->
+<article class="item">
+  <a href="/imovel/44002/" class="item-link">Moradia isolada</a>
+  <span class="item-price">300.000 €<script>/* <b>bogus</b> */</script></span>
+</article>
+</main></body></html>"""
+
+CASASAPO_HTML = """<html><body><div class="searchResults">
+<div class="searchItem" data-id="cs1">
+  <!-- <span class="searchItemTitle">bogus</span></div> -->
+  <a href="/comprar-apartamento-t2/?id=1"><img/></a>
+  <span class="searchItemTitle">Apartamento T2, Barcelos</span>
+  <script>x = '<span class="searchItemValue">bogus</span>';</script>
+  <span class="searchItemValue">210.000 €</span>
+</div>
+<div class="searchItem premium">
+  <style>.searchItemValue { color: red; }</style>
+  <a href="https://casa.sapo.pt/x/2">l</a>
+  <span class="searchItemTitle">Moradia T4</span>
+  <span class="searchItemValue">410.000 €<!-- <span>bogus</span> --></span>
+</div>
+</div></body></html>"""
+
+
+def _dom_parse(module, name, html_content):
+    with mock.patch.object(module, f'_parse_{name}_fast', return_value=None):
+        return getattr(module, f'parse_{name}')(html_content)
+
+
+class FastPathMatchesDomTest(unittest.TestCase):
+
+    def assert_same(self, module, name, html_content, expected_prices):
+        fast = getattr(module, f'_parse_{name}_fast')(html_content)
+        dom = _dom_parse(module, name, html_content)
+        self.assertEqual(fast, dom)
+        self.assertEqual([prop.price for prop in fast], expected_prices)
+
+    def test_olx(self):
+        self.assert_same(olx, 'olx', OLX_HTML, ['100 €', '180 000 €'])
+
+    def test_idealista(self):
+        self.assert_same(idealista, 'idealista', IDEALISTA_HTML, ['230.000€', '300.000 €'])
+
+    def test_casasapo(self):
+        self.assert_same(casasapo, 'casasapo', CASASAPO_HTML, ['210.000 €', '410.000 €'])
+
+
+if __name__ == '__main__':
+    unittest.main()